@@ -1,62 +1,69 @@
+import contextlib
 import streamlit as st
-from utils.survey_utils import predict_survey_risk
-from emotion.emotion_engine import run_emotion_session
+from utils.survey_utils import current_models, predict_survey_risk
+from utils import metrics
+from utils.fusion import fuse_risk
+from utils.model_registry import get_registry
+from emotion.emotion_engine import get_backend, run_emotion_session
 
-# -------------------------------------------------
-# Page config
-# -------------------------------------------------
-st.set_page_config(
-    page_title="ASD Screening Application",
-    page_icon="🧠",
-    layout="centered"
-)
+metrics.start_from_env()
 
-st.title("🧠 Autism Spectrum Disorder (ASD) Screening Tool")
-st.caption("This application is a screening aid and not a medical diagnosis.")
+# Pick up newly activated model versions; they load in the background and
+# are used from the next submission on
+get_registry().refresh()
 
 # -------------------------------------------------
-# Survey Section
+# Rerun accounting
 # -------------------------------------------------
-st.header("📝 Parent / Caregiver Questionnaire")
-st.caption("Q-CHAT-10: Quantitative Checklist for Autism in Toddlers (18–24 months)")
+# Each section is a fragment: interacting with it re-runs only that
+# section, and the questionnaire is a form, so answering a question does
+# not re-run anything until it is submitted. Full-script runs and runs of
+# every section are counted (per session and in metrics) together with
+# the CPU time of the script thread:
+#   app_<section>_runs_total, app_<section>_cpu_seconds,
+#   app_runs_per_screening (all runs until a result is shown; the next
+#   submission after that starts counting a new screening)
 
-# ---- Child Demographics ----
-st.subheader("👶 Child Information")
 
-col1, col2 = st.columns(2)
+@contextlib.contextmanager
+def section(name):
+    runs = st.session_state.setdefault("runs", {})
+    runs[name] = runs.get(name, 0) + 1
+    metrics.count(f"app_{name}_runs_total")
+    with metrics.cpu_timer(f"app_{name}_cpu_seconds"):
+        yield
 
-with col1:
-    age_months = st.number_input(
-        "Child's Age (in months)",
-        min_value=18,
-        max_value=36,
-        value=24,
-        step=1
-    )
-    sex = st.selectbox(
-        "Child's Gender",
-        ["m", "f"],
-        format_func=lambda x: "Male" if x == "m" else "Female"
-    )
-    
-
-with col2:
-    
-    family_asd = st.radio(
-        "Does any family member have ASD?",
-        ["no", "yes"],
-        horizontal=True
-    )
-    
 
-st.divider()
+def new_screening(name):
+    """Starts counting runs afresh if the last screening's result was reported."""
+    if st.session_state.pop("runs_reported", False):
+        # Only this run of section `name` belongs to the new screening
+        st.session_state["runs"] = {s: int(s == name) for s in st.session_state["runs"]}
+
+
+def rerun_if_complete():
+    """Re-runs the whole page once both results exist, to show the final result."""
+    if "survey_risk" in st.session_state and "emotion_score" in st.session_state:
+        st.rerun()
+
 
 # -------------------------------------------------
-# Q-CHAT-10 Questions (Yes/No - matches dataset)
+# Page config
 # -------------------------------------------------
-st.subheader("📋 Behavioural Questions")
-st.caption("For each question, please select Yes or No based on your child's behaviour.")
+def page_header():
+    st.set_page_config(
+        page_title="ASD Screening Application",
+        page_icon="🧠",
+        layout="centered"
+    )
 
+    st.title("🧠 Autism Spectrum Disorder (ASD) Screening Tool")
+    st.caption("This application is a screening aid and not a medical diagnosis.")
+
+
+# -------------------------------------------------
+# Survey Section
+# -------------------------------------------------
 questions = [
     "Does your child look at you when you call his/her name?",
     "How easy is it for you to get eye contact with your child?",
@@ -70,62 +77,119 @@ questions = [
     "Does your child stare at nothing with no apparent purpose?"
 ]
 
-answers = []
 
-for i, q in enumerate(questions, start=1):
-    response = st.radio(
-        f"Q{i}. {q}",
-        ["No", "Yes"],
-        horizontal=True,
-        key=f"q{i}"
-    )
-    answers.append(1 if response == "Yes" else 0)
-
-# Show live Q-CHAT score
-qchat_score = sum(answers)
-st.info(
-    f"📊 Q-CHAT-10 Score: **{qchat_score}/10** — "
-    f"{'⚠️ Score > 3: Consider referral for further assessment' if qchat_score > 3 else '✅ Score ≤ 3: Low concern'}"
-)
-
-if st.button("Submit Survey"):
-    survey_risk, survey_prob = predict_survey_risk(
-        answers,
-        age_months=age_months,
-        sex=sex,
-        
-        
-        family_asd=family_asd,
-        
-    )
-    st.session_state["survey_risk"] = survey_risk
-    st.session_state["survey_prob"] = survey_prob
+@st.fragment
+def questionnaire_section():
+    with section("questionnaire"):
+        st.header("📝 Parent / Caregiver Questionnaire")
+        st.caption("Q-CHAT-10: Quantitative Checklist for Autism in Toddlers (18–24 months)")
+
+        with st.form("questionnaire"):
+            # ---- Child Demographics ----
+            st.subheader("👶 Child Information")
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                age_months = st.number_input(
+                    "Child's Age (in months)",
+                    min_value=18,
+                    max_value=36,
+                    value=24,
+                    step=1
+                )
+                sex = st.selectbox(
+                    "Child's Gender",
+                    ["m", "f"],
+                    format_func=lambda x: "Male" if x == "m" else "Female"
+                )
+
+            with col2:
+                family_asd = st.radio(
+                    "Does any family member have ASD?",
+                    ["no", "yes"],
+                    horizontal=True
+                )
+
+            st.divider()
+
+            # ---- Q-CHAT-10 Questions (Yes/No - matches dataset) ----
+            st.subheader("📋 Behavioural Questions")
+            st.caption("For each question, please select Yes or No based on your child's behaviour.")
+
+            answers = []
+
+            for i, q in enumerate(questions, start=1):
+                response = st.radio(
+                    f"Q{i}. {q}",
+                    ["No", "Yes"],
+                    horizontal=True,
+                    key=f"q{i}"
+                )
+                answers.append(1 if response == "Yes" else 0)
+
+            submitted = st.form_submit_button("Submit Survey")
+
+        if submitted:
+            new_screening("questionnaire")
+            survey_version, survey_models = current_models()
+            survey_risk, survey_prob = predict_survey_risk(
+                answers,
+                age_months=age_months,
+                sex=sex,
+                family_asd=family_asd,
+                models=survey_models,
+            )
+            st.session_state["survey_risk"] = survey_risk
+            st.session_state["survey_prob"] = survey_prob
+            st.session_state["survey_version"] = survey_version
+            st.session_state["qchat_score"] = sum(answers)
+            rerun_if_complete()
+
+        if "survey_risk" in st.session_state:
+            # Q-CHAT score of the submitted answers
+            qchat_score = st.session_state["qchat_score"]
+            st.info(
+                f"📊 Q-CHAT-10 Score: **{qchat_score}/10** — "
+                f"{'⚠️ Score > 3: Consider referral for further assessment' if qchat_score > 3 else '✅ Score ≤ 3: Low concern'}"
+            )
+            st.success(f"📝 Survey Risk Level: **{st.session_state['survey_risk']}**")
+            if st.session_state["survey_prob"] is not None:
+                st.caption(f"Predicted ASD Probability: {round(st.session_state['survey_prob'], 2)}")
 
-    st.success(f"📝 Survey Risk Level: **{survey_risk}**")
-    if survey_prob is not None:
-        st.caption(f"Predicted ASD Probability: {round(survey_prob, 2)}")
 
 # -------------------------------------------------
 # Emotion Detection Section
 # -------------------------------------------------
-st.header("😊 Emotion Recognition Assessment")
+@st.fragment
+def emotion_section():
+    with section("emotion"):
+        st.header("😊 Emotion Recognition Assessment")
 
-st.write(
-    "The child will be shown a set of emotional stimuli while facial expressions "
-    "are analyzed to evaluate emotional responsiveness."
-)
+        st.write(
+            "The child will be shown a set of emotional stimuli while facial expressions "
+            "are analyzed to evaluate emotional responsiveness."
+        )
 
-if st.button("Run Emotion Analysis"):
-    with st.spinner("Running emotion analysis... Please wait"):
-        emotion_score = run_emotion_session()
-        st.session_state["emotion_score"] = emotion_score
+        if st.button("Run Emotion Analysis"):
+            new_screening("emotion")
+            with st.spinner("Running emotion analysis... Please wait"):
+                emotion_backend = get_backend()
+                emotion_score = run_emotion_session(backend=emotion_backend)
+                st.session_state["emotion_score"] = emotion_score
+                st.session_state["emotion_version"] = emotion_backend.version
+            rerun_if_complete()
+
+        if "emotion_score" in st.session_state:
+            st.success(f"Emotion Analysis Completed (Score: {st.session_state['emotion_score']})")
 
-    st.success(f"Emotion Analysis Completed (Score: {emotion_score})")
 
 # -------------------------------------------------
 # Final ASD Risk Assessment
 # -------------------------------------------------
-if "survey_risk" in st.session_state and "emotion_score" in st.session_state:
+def result_section():
+    if "survey_risk" not in st.session_state or "emotion_score" not in st.session_state:
+        return
 
     st.header("🧩 Final ASD Screening Result")
 
@@ -133,12 +197,7 @@ if "survey_risk" in st.session_state and "emotion_score" in st.session_state:
     emotion_score = st.session_state["emotion_score"]
 
     # Rule-based fusion (survey priority)
-    if survey_risk == "High" or emotion_score == 2:
-        final_risk = "High"
-    elif survey_risk == "Moderate" or emotion_score == 1:
-        final_risk = "Moderate"
-    else:
-        final_risk = "Low"
+    final_risk = fuse_risk(survey_risk, emotion_score)
 
     if final_risk == "High":
         st.error("⚠️ **High ASD Risk Detected**")
@@ -150,4 +209,27 @@ if "survey_risk" in st.session_state and "emotion_score" in st.session_state:
     st.caption(
         "This result is based on combined survey responses and emotion recognition. "
         "It is intended only as a preliminary screening tool."
-    )
\ No newline at end of file
+    )
+    st.caption(
+        f"Model versions: survey {st.session_state['survey_version']}, "
+        f"emotion {st.session_state['emotion_version']}"
+    )
+
+    if not st.session_state.get("runs_reported"):
+        # Every page run also runs each fragment once; the rest of a
+        # fragment's runs were fragment-only re-runs
+        st.session_state["runs_reported"] = True
+        runs = st.session_state["runs"]
+        page = runs["page"]
+        total = page + sum(n - page for name, n in runs.items() if name != "page")
+        metrics.observe("app_runs_per_screening", total)
+
+
+# -------------------------------------------------
+# Page
+# -------------------------------------------------
+with section("page"):
+    page_header()
+    questionnaire_section()
+    emotion_section()
+    result_section()
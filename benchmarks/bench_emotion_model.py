@@ -0,0 +1,84 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import latency_summary, peak_rss_mb, rss_mb
+
+# -------------------------------------------------
+# Emotion model latency / memory benchmark
+# -------------------------------------------------
+# Each variant is measured in its own interpreter so resident memory is
+# not polluted by the other model.
+#
+#   python -m benchmarks.bench_emotion_model
+#   python -m benchmarks.bench_emotion_model --models a.h5 b.tflite
+
+DEFAULT_MODELS = [
+    "models/best_emotion_model_ferplus_colab_2.h5",
+    "models/best_emotion_model_ferplus_colab_2_int8.tflite",
+]
+
+
+def measure(path, runs=200, warmup=20):
+    from emotion.quantize import load_emotion_model
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = load_emotion_model(path)
+    load_s = time.perf_counter() - start
+    rss_loaded = rss_mb()
+
+    face = np.random.default_rng(0).random((1, 48, 48, 1), dtype=np.float32)
+    for _ in range(warmup):
+        model.predict(face, verbose=0)
+
+    lat = np.empty(runs)
+    for i in range(runs):
+        t0 = time.perf_counter()
+        model.predict(face, verbose=0)
+        lat[i] = time.perf_counter() - t0
+
+    return {
+        "model": path,
+        "load_s": round(load_s, 3),
+        **latency_summary(lat),
+        "inferences_per_s": round(runs / lat.sum(), 1),
+        "model_rss_mb": round(rss_loaded - rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark emotion model variants")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        print(json.dumps(measure(args.single, args.runs)))
+        return 0
+
+    print(f"{'model':60s} {'load s':>7s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'inf/s':>8s} {'model MB':>9s} {'peak MB':>8s}")
+    for path in args.models:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_emotion_model",
+             "--single", path, "--runs", str(args.runs)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{path:60s} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{path:60s} {r['load_s']:7.2f} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} "
+              f"{r['inferences_per_s']:8.1f} {r['model_rss_mb']:9.1f} {r['peak_rss_mb']:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from emotion.face_detector import DETECTORS
+from emotion.subject import iou
+
+# -------------------------------------------------
+# Face detector speed / recall benchmark
+# -------------------------------------------------
+# Runs every detector over a local labelled set of frames and reports
+# frames/s, detections/s, recall and precision, then picks the fastest
+# detector that meets the recall target. The labelled set is a directory
+# of images plus labels.json mapping each file name to its face boxes:
+#
+#   {"frame_0001.jpg": [[x, y, w, h], ...], ...}
+#
+#   python -m benchmarks.bench_face_detector path/to/labelled_frames --recall 0.9
+#
+# Use the pick on that kiosk with ASD_FACE_DETECTOR=<name>.
+
+
+def load_labelled(directory):
+    with open(os.path.join(directory, "labels.json")) as f:
+        labels = json.load(f)
+    frames = []
+    for name, boxes in sorted(labels.items()):
+        image = cv2.imread(os.path.join(directory, name))
+        if image is None:
+            raise FileNotFoundError(f"cannot read {name} in {directory}")
+        frames.append((image, [tuple(b) for b in boxes]))
+    return frames
+
+
+def match(truth, found, min_iou=0.5):
+    """(true positives, false positives) matching boxes one-to-one by IoU."""
+    unmatched = [tuple(int(v) for v in b) for b in found]
+    hits = 0
+    for t in truth:
+        if not unmatched:
+            break
+        overlap, best = max((iou(t, b), b) for b in unmatched)
+        if overlap >= min_iou:
+            hits += 1
+            unmatched.remove(best)
+    return hits, len(unmatched)
+
+
+def measure(name, frames, repeats=3, min_iou=0.5):
+    detector = DETECTORS[name]()
+
+    def run(image):
+        if detector.gray:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return detector.detect(image)
+
+    run(frames[0][0])                       # warm-up
+    elapsed = 0.0
+    detections = true_pos = false_pos = 0
+    for repeat in range(repeats):
+        for image, truth in frames:
+            start = time.perf_counter()
+            found = run(image)
+            elapsed += time.perf_counter() - start
+            if repeat == 0:
+                tp, fp = match(truth, found, min_iou)
+                true_pos  += tp
+                false_pos += fp
+                detections += len(found)
+
+    n_frames = len(frames) * repeats
+    n_truth  = sum(len(truth) for _, truth in frames)
+    return {
+        "detector": name,
+        "frames_per_s": round(n_frames / elapsed, 1),
+        "detections_per_s": round(detections * repeats / elapsed, 1),
+        "ms_per_frame": round(1000 * elapsed / n_frames, 2),
+        "recall": round(true_pos / n_truth, 3) if n_truth else None,
+        "precision": round(true_pos / (true_pos + false_pos), 3) if true_pos + false_pos else None,
+    }
+
+
+def pick(results, recall_target):
+    """Fastest detector whose recall meets the target, or None."""
+    eligible = [r for r in results if r["recall"] is not None and r["recall"] >= recall_target]
+    return max(eligible, key=lambda r: r["frames_per_s"]) if eligible else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark face detectors on labelled frames")
+    parser.add_argument("frames", help="directory with images and labels.json")
+    parser.add_argument("--detectors", nargs="+", default=sorted(DETECTORS))
+    parser.add_argument("--recall", type=float, default=0.9, help="minimum recall")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU counting as a match")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    frames = load_labelled(args.frames)
+
+    results = []
+    print(f"{'detector':10s} {'frames/s':>9s} {'dets/s':>8s} {'ms/frame':>9s} "
+          f"{'recall':>7s} {'precision':>9s}")
+    for name in args.detectors:
+        try:
+            r = measure(name, frames, args.repeats, args.iou)
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"{name:10s} unavailable: {e}")
+            continue
+        results.append(r)
+        print(f"{name:10s} {r['frames_per_s']:9.1f} {r['detections_per_s']:8.1f} "
+              f"{r['ms_per_frame']:9.2f} {r['recall']!s:>7s} {r['precision']!s:>9s}")
+
+    best = pick(results, args.recall)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"recall_target": args.recall, "results": results,
+                       "pick": best and best["detector"]}, f, indent=2)
+
+    if best is None:
+        print(f"no detector reaches recall {args.recall}")
+        return 1
+    print(f"fastest with recall >= {args.recall}: {best['detector']}  "
+          f"(ASD_FACE_DETECTOR={best['detector']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import argparse
+import multiprocessing as mp
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import latency_summary
+
+# -------------------------------------------------
+# Frame transport benchmark: Queue vs SharedFramePool
+# -------------------------------------------------
+# A producer process emits synthetic frames at a target rate; a consumer
+# process touches every frame it receives (strided checksum) and records
+# end-to-end latency. The queue path pickles each frame, the shared-memory
+# path only passes through the pool.
+#
+#   python -m benchmarks.bench_frame_transport
+#   python -m benchmarks.bench_frame_transport --resolutions 640x480,1920x1080 --fps 30,0
+
+RESOLUTIONS = "320x240,640x480,1280x720,1920x1080"
+RATES       = "15,30,60,0"     # 0 = as fast as possible
+
+
+def _pace(start, i, fps):
+    if fps:
+        delay = start + i / fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _touch(frame):
+    return int(frame[::16, ::16].sum())
+
+
+# ---- queue transport ----
+def _queue_producer(q, shape, frames, fps):
+    frame = np.zeros(shape, dtype=np.uint8)
+    start = time.perf_counter()
+    for i in range(frames):
+        _pace(start, i, fps)
+        frame[0, 0, 0] = i % 256
+        q.put((time.perf_counter(), frame))
+    q.put(None)
+
+
+def _queue_consumer(q, out):
+    lat = []
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        ts, frame = item
+        _touch(frame)
+        lat.append(time.perf_counter() - ts)
+    out.put(lat)
+
+
+# ---- shared-memory transport ----
+def _shm_producer(spec, shape, frames, fps, done):
+    from emotion.frame_pool import SharedFramePool
+
+    pool = SharedFramePool.attach(**spec)
+    frame = np.zeros(shape, dtype=np.uint8)
+    start = time.perf_counter()
+    for i in range(frames):
+        _pace(start, i, fps)
+        frame[0, 0, 0] = i % 256
+        pool.write(frame, ts=time.perf_counter())
+    done.set()
+    pool.close()
+
+
+def _shm_consumer(spec, done, out):
+    from emotion.frame_pool import SharedFramePool
+
+    pool = SharedFramePool.attach(**spec)
+    lat, last, overruns = [], -1, 0
+    while True:
+        got = pool.latest(after=last)
+        if got is None:
+            if done.is_set() and pool.head == last:
+                break
+            time.sleep(0.0005)
+            continue
+        seq, ts, frame = got
+        _touch(frame)
+        if pool.still_valid(seq):
+            lat.append(time.perf_counter() - ts)
+        else:
+            overruns += 1
+        last = seq
+    pool.close()
+    out.put((lat, overruns))
+
+
+def bench(transport, shape, frames, fps):
+    out = mp.Queue()
+    start = time.perf_counter()
+    if transport == "queue":
+        q = mp.Queue(maxsize=8)
+        procs = [mp.Process(target=_queue_producer, args=(q, shape, frames, fps)),
+                 mp.Process(target=_queue_consumer, args=(q, out))]
+        for p in procs:
+            p.start()
+        lat, overruns = out.get(), 0
+    else:
+        from emotion.frame_pool import SharedFramePool
+
+        pool = SharedFramePool.create(slots=8, shape=shape)
+        done = mp.Event()
+        procs = [mp.Process(target=_shm_producer, args=(pool.spec, shape, frames, fps, done)),
+                 mp.Process(target=_shm_consumer, args=(pool.spec, done, out))]
+        for p in procs:
+            p.start()
+        lat, overruns = out.get()
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - start
+    if transport != "queue":
+        pool.close()
+
+    return {
+        "transport": transport,
+        "resolution": f"{shape[1]}x{shape[0]}",
+        "target_fps": fps or "max",
+        "delivered": len(lat),
+        "delivered_fps": round(len(lat) / wall, 1),
+        "overruns": overruns,
+        **latency_summary(lat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare frame transports between processes")
+    parser.add_argument("--resolutions", default=RESOLUTIONS)
+    parser.add_argument("--fps", default=RATES)
+    parser.add_argument("--seconds", type=float, default=3.0,
+                        help="stream length at the target rate (300 frames at max rate)")
+    args = parser.parse_args(argv)
+
+    print(f"{'transport':10s} {'res':>10s} {'target':>7s} {'fps':>8s} {'p50 ms':>8s} "
+          f"{'p95 ms':>8s} {'p99 ms':>8s} {'skipped':>8s}")
+    for res in args.resolutions.split(","):
+        w, h = (int(v) for v in res.split("x"))
+        for fps in (int(f) for f in args.fps.split(",")):
+            frames = int(args.seconds * fps) if fps else 300
+            for transport in ("queue", "shm"):
+                r = bench(transport, (h, w, 3), frames, fps)
+                # The shared pool keeps only the newest frames; count skipped ones
+                skipped = frames - r["delivered"]
+                print(f"{r['transport']:10s} {r['resolution']:>10s} {str(r['target_fps']):>7s} "
+                      f"{r['delivered_fps']:8.1f} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} "
+                      f"{r['p99_ms']:8.2f} {skipped:8d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from utils.startup import import_profile, total_import_us
+
+# -------------------------------------------------
+# desktop.py time-to-interactive benchmark
+# -------------------------------------------------
+# Launches the desktop app repeatedly with --measure-startup (needs a
+# display) and reports time-to-interactive: from the start of desktop.py
+# until the Tk loop is first idle, and from process launch for the
+# end-to-end figure. Also reports the import cost of the entry point.
+#
+#   python -m benchmarks.bench_startup --runs 10
+#   python -m benchmarks.bench_startup --json startup.json   # track over time
+
+
+def measure_once(backend):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "desktop.py", "--measure-startup", "--backend", backend],
+        capture_output=True, text=True, timeout=120,
+    )
+    launch_to_exit = time.perf_counter() - start
+    for line in proc.stdout.splitlines():
+        if line.startswith("time_to_interactive_s"):
+            return float(line.split()[1]), launch_to_exit
+    raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "no output")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark desktop.py startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", default="real")
+    parser.add_argument("--json", help="append the result as one JSON line to this file")
+    args = parser.parse_args(argv)
+
+    imports_ms = total_import_us(import_profile("desktop")) / 1000
+
+    tti, total = [], []
+    for _ in range(args.runs):
+        t, e = measure_once(args.backend)
+        tti.append(t)
+        total.append(e)
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend": args.backend,
+        "runs": args.runs,
+        "import_ms": round(imports_ms, 1),
+        "tti_median_s": round(statistics.median(tti), 4),
+        "tti_max_s": round(max(tti), 4),
+        "launch_to_exit_median_s": round(statistics.median(total), 4),
+    }
+    for key, value in result.items():
+        print(f"{key:24s} {value}")
+
+    if args.json:
+        with open(args.json, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
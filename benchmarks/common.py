@@ -0,0 +1,42 @@
+import resource
+
+import numpy as np
+
+# -------------------------------------------------
+# Shared helpers for the benchmark scripts
+# -------------------------------------------------
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux)."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def peak_rss_mb(children=False):
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def cpu_seconds(children=False):
+    """User + system CPU time consumed so far."""
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+def latency_summary(seconds):
+    """p50 / p95 / p99 / max of a list of durations, in milliseconds."""
+    lat = np.asarray(seconds, dtype=np.float64) * 1000
+    if not len(lat):
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(lat.max()), 3),
+    }
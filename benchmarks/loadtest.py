@@ -0,0 +1,186 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.common import cpu_seconds, latency_summary, peak_rss_mb, rss_mb
+
+# -------------------------------------------------
+# Concurrent screening load generator
+# -------------------------------------------------
+# Drives the survey path (predict_survey_risk) and/or the emotion path
+# (headless EmotionEngine replaying a recorded video) at increasing
+# concurrency and reports throughput, latency percentiles, CPU and memory
+# for each level, plus the level where throughput stops scaling.
+#
+#   python -m benchmarks.loadtest --path survey --levels 1,2,4,8,16
+#   python -m benchmarks.loadtest --path emotion --video data/session.mp4 \
+#       --levels 1,2,4 --requests 8 --mode process
+
+# -------------------------------------------------
+# Jobs (module level so process pools can pickle them)
+# -------------------------------------------------
+def survey_job(seed, _video=None, _stimulus_seconds=None):
+    from utils.survey_utils import predict_survey_risk
+
+    rng = random.Random(seed)
+    predict_survey_risk(
+        [rng.randint(0, 1) for _ in range(10)],
+        age_months=rng.randint(18, 36),
+        sex=rng.choice(["m", "f"]),
+        family_asd=rng.choice(["yes", "no"]),
+    )
+
+
+def emotion_job(_seed, video, stimulus_seconds):
+    from emotion.capture_policy import CapturePolicy
+    from emotion.emotion_engine import EmotionEngine
+
+    policy = CapturePolicy(min_duration=stimulus_seconds,
+                           base_duration=stimulus_seconds,
+                           max_duration=stimulus_seconds)
+    with EmotionEngine(source=video, policy=policy, headless=True) as engine:
+        engine.run_session()
+
+
+def screening_job(seed, video, stimulus_seconds):
+    survey_job(seed)
+    emotion_job(seed, video, stimulus_seconds)
+
+
+JOBS = {"survey": survey_job, "emotion": emotion_job, "both": screening_job}
+
+
+def _timed(job, seed, video, stimulus_seconds):
+    start = time.perf_counter()
+    try:
+        job(seed, video, stimulus_seconds)
+        ok = True
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def _warmup(job_name, video, stimulus_seconds):
+    # Load models once per worker so cold start is not counted as latency
+    _timed(JOBS[job_name], 0, video, stimulus_seconds)
+
+
+def _rendezvous(barrier):
+    # Holds a worker until every worker of the pool is running it, so all
+    # of them exist (and have finished _warmup) when this returns
+    barrier.wait(timeout=600)
+    return os.getpid(), rss_mb(), cpu_seconds()
+
+
+def _all_workers(pool, barrier, concurrency):
+    """{pid: (rss_mb, cpu_seconds)} of every process-pool worker."""
+    futures = [pool.submit(_rendezvous, barrier) for _ in range(concurrency)]
+    return {pid: (rss, cpu) for pid, rss, cpu in (f.result() for f in futures)}
+
+
+def _drive(pool, job, requests, video, stimulus_seconds):
+    """Runs `requests` jobs on a warmed-up pool: (results, wall seconds)."""
+    wall_start = time.perf_counter()
+    futures = [pool.submit(_timed, job, seed, video, stimulus_seconds)
+               for seed in range(requests)]
+    results = [f.result() for f in futures]
+    return results, time.perf_counter() - wall_start
+
+
+# -------------------------------------------------
+# Load levels
+# -------------------------------------------------
+def run_level(job_name, concurrency, requests, mode, video=None, stimulus_seconds=1.0):
+    job = JOBS[job_name]
+    if mode == "process":
+        with multiprocessing.Manager() as manager:
+            barrier = manager.Barrier(concurrency)
+            with ProcessPoolExecutor(concurrency, initializer=_warmup,
+                                     initargs=(job_name, video, stimulus_seconds)) as pool:
+                # Start and warm up every worker before the clocks start
+                before = _all_workers(pool, barrier, concurrency)
+                results, wall = _drive(pool, job, requests, video, stimulus_seconds)
+                after = _all_workers(pool, barrier, concurrency)
+        # CPU and memory are read inside the workers; the parent only dispatches
+        # (the rendezvous itself is included, but costs next to nothing)
+        cpu = sum(after[pid][1] - before[pid][1] for pid in after)
+        worker_rss = [rss for rss, _ in after.values()]
+        memory = {"rss_mb": round(sum(worker_rss) / len(worker_rss), 1),
+                  "worker_rss_max_mb": round(max(worker_rss), 1),
+                  "peak_rss_mb": round(peak_rss_mb(children=True), 1)}
+    else:
+        _warmup(job_name, video, stimulus_seconds)
+        with ThreadPoolExecutor(concurrency) as pool:
+            cpu_start = cpu_seconds()
+            results, wall = _drive(pool, job, requests, video, stimulus_seconds)
+            cpu = cpu_seconds() - cpu_start
+        memory = {"rss_mb": round(rss_mb(), 1),
+                  "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+    durations = [d for d, ok in results if ok]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput_per_s": round(len(durations) / wall, 3),
+        **latency_summary(durations),
+        "cpu_util": round(cpu / wall / (os.cpu_count() or 1), 3),
+        **memory,
+    }
+
+
+def find_saturation(levels, min_gain=0.10):
+    """
+    Returns the concurrency after which throughput grows by less than
+    `min_gain` (relative) per step, i.e. the host's saturation point.
+    """
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["throughput_per_s"] < prev["throughput_per_s"] * (1 + min_gain):
+            return prev["concurrency"]
+    return levels[-1]["concurrency"] if levels else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent screening load test")
+    parser.add_argument("--path", choices=sorted(JOBS), default="survey")
+    parser.add_argument("--levels", default="1,2,4,8,16",
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="requests per level (per worker at least one)")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--video", help="recorded video replayed by the emotion path")
+    parser.add_argument("--stimulus-seconds", type=float, default=1.0)
+    parser.add_argument("--min-gain", type=float, default=0.10)
+    parser.add_argument("--json", help="write all results to this file")
+    args = parser.parse_args(argv)
+
+    if args.path in ("emotion", "both") and not args.video:
+        parser.error("--video is required for the emotion path")
+
+    levels = []
+    print(f"{'conc':>5s} {'req/s':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} "
+          f"{'cpu':>6s} {'rss MB':>8s} {'err':>4s}")
+    for concurrency in [int(c) for c in args.levels.split(",")]:
+        r = run_level(args.path, concurrency, max(args.requests, concurrency),
+                      args.mode, args.video, args.stimulus_seconds)
+        levels.append(r)
+        print(f"{r['concurrency']:5d} {r['throughput_per_s']:9.2f} {r['p50_ms']:9.1f} "
+              f"{r['p95_ms']:9.1f} {r['p99_ms']:9.1f} {r['cpu_util']:6.0%} "
+              f"{r['peak_rss_mb']:8.1f} {r['errors']:4d}")
+
+    saturation = find_saturation(levels, args.min_gain)
+    print(f"saturation point: concurrency {saturation}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "levels": levels, "saturation": saturation}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,98 @@
-import customtkinter as ctk
+import time
+_T0 = time.perf_counter()   # start of module execution, for time-to-interactive
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
 import threading
 
-# ── Lazy-import your real modules ──────────────────────────────────────────────
-try:
-    from utils.survey_utils import predict_survey_risk
-    from emotion.emotion_engine import run_emotion_session
-except ImportError:
-    # Fallback stubs so the UI runs standalone for development
-    def predict_survey_risk(answers, age_months, sex, family_asd):
+import customtkinter as ctk
+from utils import metrics, resource_guard
+
+log = logging.getLogger("desktop")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ANALYSIS BACKENDS
+# ══════════════════════════════════════════════════════════════════════════════
+# The heavy modules (scikit-learn via pickle, TensorFlow, OpenCV, NumPy) are
+# imported on first use, so the window appears before they load. Pick one
+# explicitly with --backend or ASD_BACKEND:
+#   real  the trained survey and emotion models (default)
+#   stub  lightweight stand-ins so the UI runs standalone for development
+
+class RealBackend:
+    name = "real"
+
+    def __init__(self):
+        self.versions = {}   # model version behind the latest result, per kind
+        self.source   = 0    # camera index, or a recorded video (soak tests)
+
+    def predict_survey_risk(self, answers, age_months, sex, family_asd):
+        from utils.survey_utils import current_models, predict_survey_risk
+        version, models = current_models()
+        self.versions["survey"] = version
+        return predict_survey_risk(answers, age_months=age_months,
+                                   sex=sex, family_asd=family_asd, models=models)
+
+    def run_emotion_session(self):
+        from emotion.emotion_engine import get_backend, run_emotion_session
+        emotion_backend = get_backend()
+        self.versions["emotion"] = emotion_backend.version
+        return run_emotion_session(source=self.source, backend=emotion_backend)
+
+    def warm_up(self):
+        """Loads both models in the background once the window is up."""
+        with metrics.timer("startup_warm_up_seconds"):
+            from utils.survey_utils import load_models
+            load_models()
+            from emotion.emotion_engine import get_backend
+            get_backend()
+
+    def new_screening(self):
+        """Starts loading newly activated model versions between screenings."""
+        from utils.model_registry import get_registry
+        get_registry().refresh()
+
+
+class StubBackend:
+    name = "stub"
+    versions = {"survey": "stub", "emotion": "stub"}
+    source   = None
+
+    def predict_survey_risk(self, answers, age_months, sex, family_asd):
         score = sum(answers)
         prob  = score / 10
         risk  = "High" if score > 6 else "Moderate" if score > 3 else "Low"
         return risk, prob
 
-    def run_emotion_session():
-        import time; time.sleep(2)
+    def run_emotion_session(self):
+        time.sleep(2)
         return 1
 
+    def warm_up(self):
+        pass
+
+    def new_screening(self):
+        pass
+
+
+BACKENDS = {"real": RealBackend, "stub": StubBackend}
+
+backend = None   # selected in main from --backend / ASD_BACKEND
+guard   = None   # ResourceGuard checked between screenings (set in main)
+
+
+def _warm_up():
+    try:
+        backend.warm_up()
+    except Exception:
+        log.exception("warm-up of the %s backend failed; "
+                      "run with --backend stub to use the UI without models", backend.name)
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # THEME ENGINE
@@ -575,7 +651,7 @@ class EmotionPage(BasePage):
         threading.Thread(target=self._thread, daemon=True).start()
 
     def _thread(self):
-        score = run_emotion_session()
+        score = backend.run_emotion_session()
         self.after(0, lambda: self._done(score))
 
     def _done(self, score):
@@ -653,7 +729,11 @@ class ResultPage(BasePage):
                 "professional for a formal evaluation."
             ),
             font=ctk.CTkFont(size=11), text_color=T["text_light"], justify="center")
-        self._disc.pack(pady=(20, 22))
+        self._disc.pack(pady=(20, 0))
+
+        self._ver = ctk.CTkLabel(col, text="",
+            font=ctk.CTkFont(size=9), text_color=T["text_light"])
+        self._ver.pack(pady=(6, 22))
 
         self._restart = ctk.CTkButton(col, text="Start New Assessment",
             font=ctk.CTkFont(size=13, weight="bold"), height=44, corner_radius=8,
@@ -673,13 +753,9 @@ class ResultPage(BasePage):
         f._vlbl = v
         return f
 
-    def show_result(self, survey_risk, survey_prob, emotion_score):
-        if survey_risk == "High":
-            final = "High"
-        elif survey_risk == "Moderate":
-            final = "High" if emotion_score == 2 else "Moderate"
-        else:
-            final = "Moderate" if emotion_score == 2 else "Low"
+    def show_result(self, survey_risk, survey_prob, emotion_score, versions=None):
+        from utils.fusion import fuse_risk   # NumPy; not needed at startup
+        final = fuse_risk(survey_risk, emotion_score, survey_prob)
 
         self._risk = final
         title, note, fg_k, bg_k = self.CFG[final]
@@ -688,12 +764,16 @@ class ResultPage(BasePage):
         self._note_lbl.configure(text=note,  text_color=T[fg_k])
         self._c1._vlbl.configure(text=f"{survey_risk}  ({round(survey_prob, 2)})")
         self._c2._vlbl.configure(text=str(emotion_score))
+        versions = versions or {}
+        self._ver.configure(text=(f"Models: survey {versions.get('survey', '—')}"
+                                  f"  ·  emotion {versions.get('emotion', '—')}"))
 
     def refresh_theme(self):
         super().refresh_theme()
         self._cap.configure(text_color=T["text_light"])
         self._rule.configure(fg_color=T["gold"])
         self._disc.configure(text_color=T["text_light"])
+        self._ver.configure(text_color=T["text_light"])
         self._restart.configure(hover_color=T["surface_alt"], text_color=T["accent"],
                                  border_color=T["accent"])
         for c in [self._c1, self._c2]:
@@ -760,18 +840,21 @@ class ASDScreeningApp(ctk.CTk):
         self._active = None
 
     def _show(self, page):
-        if self._active:
-            self._active.place_forget()
-        page.place(x=0, y=0, relwidth=1.0, relheight=1.0)
-        self._active = page
+        with metrics.timer(f"ui_show_{type(page).__name__}_seconds"):
+            if self._active:
+                self._active.place_forget()
+            page.place(x=0, y=0, relwidth=1.0, relheight=1.0)
+            self._active = page
+        metrics.count("ui_page_transitions_total")
 
     def _after_demo(self, age, sex, family):
         self._age, self._sex, self._family = age, sex, family
         self._show(self._p_question)
 
+    @metrics.timed("ui_after_questions_seconds")
     def _after_q(self, answers):
         ans_int = [1 if a == "Yes" else 0 for a in answers]
-        risk, prob = predict_survey_risk(
+        risk, prob = backend.predict_survey_risk(
             ans_int, age_months=self._age,
             sex=self._sex, family_asd=self._family)
         self._sur, self._prob = risk, prob
@@ -779,10 +862,12 @@ class ASDScreeningApp(ctk.CTk):
 
     def _after_em(self, score):
         self._em = score
-        self._p_result.show_result(self._sur, self._prob, score)
+        self._p_result.show_result(self._sur, self._prob, score, dict(backend.versions))
         self._show(self._p_result)
 
+    @metrics.timed("ui_restart_seconds")
     def _restart(self):
+        backend.new_screening()
         self._p_question.destroy()
         self._p_question = QuestionPage(self._host, on_complete=self._after_q)
         self._pages[1] = self._p_question
@@ -792,6 +877,8 @@ class ASDScreeningApp(ctk.CTk):
         self._pages[2] = self._p_emotion
 
         self._show(self._p_welcome)
+        if guard is not None:
+            guard.check()
 
     def _theme_switch(self, mode):
         self._host.configure(fg_color=T["bg"])
@@ -807,11 +894,124 @@ class ASDScreeningApp(ctk.CTk):
                 pass
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# SOAK TEST
+# ══════════════════════════════════════════════════════════════════════════════
+# Drives the full screening flow (demographics → questions → emotion
+# session → result → restart) over and over with random answers, so
+# leaks show up as growth in the resource guard's samples.
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class SoakRunner:
+    POLL_MS = 200
+
+    def __init__(self, app, rounds, report_path=None, seed=0):
+        self._app     = app
+        self._rounds  = rounds
+        self._report  = report_path
+        self._rng     = random.Random(seed)
+        self.done     = 0
+        self.failed   = False
+
+    def start(self):
+        self._app.after(0, self._round)
+
+    def _round(self):
+        if self.done >= self._rounds:
+            self._finish()
+            return
+        app, rng = self._app, self._rng
+        app._after_demo(rng.randint(18, 36), rng.choice("mf"), rng.choice(["no", "yes"]))
+        app._after_q([rng.choice(["Yes", "No"]) for _ in range(10)])
+        app._p_emotion._run()
+        self._app.after(self.POLL_MS, self._wait_for_result)
+
+    def _wait_for_result(self):
+        if self._app._active is not self._app._p_result:
+            self._app.after(self.POLL_MS, self._wait_for_result)
+            return
+        self._app._restart()            # runs the resource guard
+        self.done += 1
+        sample = {"round": self.done, **(guard.latest or {})}
+        print(" ".join(f"{k}={round(v, 1)}" for k, v in sample.items()), flush=True)
+        if self._report:
+            with open(self._report, "a") as f:
+                f.write(json.dumps(sample) + "\n")
+        self._app.after(10, self._round)
+
+    def _finish(self):
+        report = guard.report()
+        for name, grown in sorted(report["growth"].items()):
+            budget = report["budgets"].get(name)
+            flag = "  OVER BUDGET" if name in report["exceeded"] else ""
+            print(f"{name:12s} grew {grown:10.1f}  (budget {budget}){flag}")
+        self.failed = bool(report["exceeded"])
+        self._app.destroy()
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ENTRY POINT
 # ══════════════════════════════════════════════════════════════════════════════
 
-if __name__ == "__main__":
+def main(argv=None):
+    global backend, guard
+
+    parser = argparse.ArgumentParser(description="ASD Screening desktop application")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="analysis backend (default: ASD_BACKEND or real)")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="load models on first use instead of in the background")
+    parser.add_argument("--diagnose-imports", action="store_true",
+                        help="print an import-time profile of this program and exit")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="print time-to-interactive once the window is idle and exit")
+    parser.add_argument("--soak", type=int, metavar="N",
+                        help="run N automatic screenings while tracking resource growth")
+    parser.add_argument("--soak-video", help="recorded video used as the camera during --soak")
+    parser.add_argument("--soak-report", help="append one JSON line of resources per round")
+    args = parser.parse_args(argv)
+
+    if args.diagnose_imports:
+        from utils.startup import format_report, import_profile
+        print(format_report(import_profile("desktop")))
+        return 0
+
+    name = args.backend or os.environ.get("ASD_BACKEND", "real")
+    if name not in BACKENDS:
+        parser.error(f"ASD_BACKEND={name!r} is not one of {', '.join(sorted(BACKENDS))}")
+    backend = BACKENDS[name]()
+    metrics.start_from_env()
     ctk.set_default_color_theme("blue")
     app = ASDScreeningApp()
-    app.mainloop()
\ No newline at end of file
+    guard = resource_guard.from_env(probes={"tk_widgets": lambda: count_widgets(app)})
+
+    soak = None
+    if args.soak:
+        if args.soak_video:
+            backend.source = args.soak_video
+        guard = guard or resource_guard.ResourceGuard(
+            probes={"tk_widgets": lambda: count_widgets(app)})
+        soak = SoakRunner(app, args.soak, args.soak_report)
+
+    def interactive():
+        tti = time.perf_counter() - _T0
+        metrics.observe("startup_time_to_interactive_seconds", tti)
+        if args.measure_startup:
+            print(f"time_to_interactive_s {tti:.4f}", flush=True)
+            app.destroy()
+            return
+        if not args.no_warm_up:
+            threading.Thread(target=_warm_up, daemon=True).start()
+        if soak is not None:
+            soak.start()
+
+    app.after_idle(interactive)
+    app.mainloop()
+    return 1 if soak is not None and soak.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import numpy as np
+
+# -------------------------------
+# Emotion score logic (UNCHANGED)
+# -------------------------------
+def compute_emotion_score(neutral_ratio):
+    if neutral_ratio < 0.4:
+        return 0
+    elif neutral_ratio < 0.7:
+        return 1
+    else:
+        return 2
+
+
+emotion_labels = [
+    "Neutral", "Happy", "Surprise", "Sad",
+    "Angry", "Disgust", "Fear", "Contempt"
+]
+
+NEUTRAL = emotion_labels.index("Neutral")
+
+
+# -------------------------------
+# Per-stimulus streaming aggregate
+# -------------------------------
+class EmotionAggregator:
+    """
+    Running per-label counts and probability sums for one stimulus.
+
+    The neutral ratio and provisional score are available after every
+    update, so the capture loop can stop as soon as the score settles.
+    `alpha` is the smoothing factor of the exponentially weighted
+    probability average. Samples whose top probability reaches
+    `min_confidence` are counted in `n_confident`.
+
+    With `weighted=True` each sample votes with its classifier confidence
+    (top probability) unless an explicit weight is given, so uncertain
+    crops move the neutral ratio less.
+    """
+
+    def __init__(self, num_classes=8, alpha=0.1, window=10, min_samples=15,
+                 min_confidence=0.5, weighted=True):
+        self.weighted       = weighted
+        self.alpha          = alpha
+        self.window         = window
+        self.min_samples    = min_samples
+        self.min_confidence = min_confidence
+
+        self.n           = 0
+        self.n_confident = 0
+        self.counts      = np.zeros(num_classes, dtype=np.int64)
+        self.prob_sums   = np.zeros(num_classes, dtype=np.float64)
+        self.weights     = np.zeros(num_classes, dtype=np.float64)
+        self.weight_sum  = 0.0
+        self.weight_sq   = 0.0
+        self.ewma        = None
+        self._score      = None
+        self._score_runs = 0   # consecutive updates with an unchanged score
+
+    def update(self, probs, weight=None):
+        probs = np.ravel(probs)
+        self.n += 1
+        top = int(np.argmax(probs))
+        self.counts[top] += 1
+        if weight is None:
+            weight = float(probs[top]) if self.weighted else 1.0
+        self.weights[top] += weight
+        self.weight_sum   += weight
+        self.weight_sq    += weight * weight
+        if probs[top] >= self.min_confidence:
+            self.n_confident += 1
+        self.prob_sums += probs
+
+        if self.ewma is None:
+            self.ewma = probs.astype(np.float64)
+        else:
+            self.ewma += self.alpha * (probs - self.ewma)
+
+        score = self.score()
+        if score == self._score:
+            self._score_runs += 1
+        else:
+            self._score, self._score_runs = score, 0
+
+    def neutral_ratio(self):
+        if self.n == 0 or self.weight_sum == 0:
+            return 1.0
+        return self.weights[NEUTRAL] / self.weight_sum
+
+    def effective_n(self):
+        """Kish effective sample size of the weighted samples."""
+        return self.weight_sum ** 2 / self.weight_sq if self.weight_sq else 0.0
+
+    def neutral_interval(self, z=1.96):
+        """Wilson score interval (low, high) for the neutral ratio."""
+        n = self.effective_n()
+        if n == 0:
+            return 0.0, 1.0
+        p = self.neutral_ratio()
+        denom  = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denom
+        half   = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+        return float(centre - half), float(centre + half)
+
+    def ewma_neutral(self):
+        if self.ewma is None:
+            return 1.0
+        return float(self.ewma[NEUTRAL] / self.ewma.sum())
+
+    def mean_probs(self):
+        if self.n == 0:
+            return self.prob_sums
+        return self.prob_sums / self.n
+
+    def score(self):
+        """Provisional compute_emotion_score for the samples seen so far."""
+        return compute_emotion_score(self.neutral_ratio())
+
+    def is_stable(self):
+        """
+        True once enough samples are in, the score has not changed over
+        the last `window` updates, and the smoothed estimate agrees with it.
+        """
+        return (
+            self.n >= self.min_samples
+            and self._score_runs >= self.window
+            and compute_emotion_score(self.ewma_neutral()) == self._score
+        )
+
+
+# -------------------------------
+# Session-level running mean
+# -------------------------------
+class SessionAggregator:
+    """Running mean of per-stimulus scores across the session."""
+
+    def __init__(self):
+        self.n     = 0
+        self.total = 0.0
+
+    def add(self, score):
+        self.n += 1
+        self.total += score
+
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+    def score(self):
+        return round(self.mean())
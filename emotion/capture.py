@@ -0,0 +1,129 @@
+import logging
+
+import cv2
+
+log = logging.getLogger(__name__)
+
+# -------------------------------
+# Capture-profile negotiation
+# -------------------------------
+class CaptureProfile:
+    """Requested camera settings; None leaves a property at the device default."""
+
+    def __init__(self, width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1):
+        self.width       = width
+        self.height      = height
+        self.fps         = fps
+        self.fourcc      = fourcc
+        self.buffer_size = buffer_size
+
+    def __repr__(self):
+        return (f"CaptureProfile({self.width}x{self.height}@{self.fps}, "
+                f"fourcc={self.fourcc}, buffer={self.buffer_size})")
+
+
+# Tried in order until the device delivers frames with one of them.
+# MJPG keeps 640x480@30 within USB2 bandwidth; the later entries fall
+# back to the device's own pixel format and then to a lighter mode.
+DEFAULT_PROFILES = [
+    CaptureProfile(640, 480, 30, "MJPG"),
+    CaptureProfile(640, 480, 30, None),
+    CaptureProfile(320, 240, 15, None),
+]
+
+
+def _apply(cap, profile):
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    if profile.width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    if profile.height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    if profile.fps:
+        cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    if profile.buffer_size:
+        # Small buffers keep frames fresh; not every backend supports it
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.buffer_size)
+
+
+def _actual(cap):
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    return {
+        "width":  int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps":    cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)) if fourcc else None,
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def open_capture(source=0, profiles=None):
+    """
+    Opens `source` and negotiates the first profile the device honours.
+
+    Video files are opened as-is. For cameras each profile is applied and
+    accepted once a frame can be read at the requested size; otherwise
+    the next one is tried, and if none match the device defaults are
+    used. Returns (capture, settings actually in effect).
+    """
+    cap = cv2.VideoCapture(source)
+    if isinstance(source, str) or not cap.isOpened():
+        return cap, _actual(cap)
+
+    for profile in profiles or DEFAULT_PROFILES:
+        _apply(cap, profile)
+        ok, frame = cap.read()
+        if not ok:
+            continue
+        h, w = frame.shape[:2]
+        if (profile.width in (None, w)) and (profile.height in (None, h)):
+            settings = _actual(cap)
+            log.info("capture negotiated %s -> %s", profile, settings)
+            return cap, settings
+        log.info("capture profile %s not honoured (got %dx%d)", profile, w, h)
+
+    # Nothing matched: reopen with the device defaults
+    cap.release()
+    cap = cv2.VideoCapture(source)
+    settings = _actual(cap)
+    log.warning("no capture profile honoured, using device defaults %s", settings)
+    return cap, settings
+
+
+# -------------------------------
+# Face region-of-interest tracking
+# -------------------------------
+class RoiTracker:
+    """
+    Restricts per-frame work to the area around the last detected face.
+
+    region() returns the (x0, y0, x1, y1) window to convert and search:
+    the last face box grown by `margin` times its size on every side, or
+    the full frame when nothing is tracked yet, after a miss, or every
+    `rescan_every` frames so new or moved faces are still found.
+    """
+
+    def __init__(self, margin=0.5, rescan_every=30):
+        self.margin       = margin
+        self.rescan_every = rescan_every
+        self._box    = None
+        self._frames = 0
+
+    def reset(self):
+        self._box = None
+
+    def region(self, shape):
+        h, w = shape[:2]
+        self._frames += 1
+        if self._box is None or self._frames % self.rescan_every == 0:
+            return 0, 0, w, h
+        x, y, bw, bh = self._box
+        mx, my = int(bw * self.margin), int(bh * self.margin)
+        return max(0, x - mx), max(0, y - my), min(w, x + bw + mx), min(h, y + bh + my)
+
+    def update(self, boxes):
+        """Tracks the largest of `boxes` (frame coordinates), or resets."""
+        if len(boxes) == 0:
+            self._box = None
+        else:
+            self._box = tuple(int(v) for v in max(boxes, key=lambda b: b[2] * b[3]))
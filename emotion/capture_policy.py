@@ -0,0 +1,46 @@
+# -------------------------------
+# Adaptive stimulus duration
+# -------------------------------
+class CapturePolicy:
+    """
+    Decides when a stimulus has collected enough evidence.
+
+    A stimulus always runs for at least `min_duration` seconds. After that
+    it ends as soon as `min_samples` confident face samples are in and
+    either the neutral-ratio confidence interval is narrower than
+    `max_ci_width` or the provisional score has stabilised. Once
+    `base_duration` is reached the quota alone is enough; if the quota is
+    still not met the stimulus is extended up to `max_duration`.
+    """
+
+    def __init__(self, min_samples=20, max_ci_width=0.3,
+                 min_duration=1.5, base_duration=5.0, max_duration=10.0,
+                 blank_duration=1.0, onset_delay=0.5):
+        self.min_samples    = min_samples
+        self.max_ci_width   = max_ci_width
+        self.min_duration   = min_duration
+        self.base_duration  = base_duration
+        self.max_duration   = max_duration
+        self.blank_duration = blank_duration
+        self.onset_delay    = onset_delay
+
+    def quota_met(self, aggregator):
+        return aggregator.n_confident >= self.min_samples
+
+    def should_stop(self, elapsed, aggregator):
+        if elapsed >= self.max_duration:
+            return True
+        if elapsed < self.min_duration or not self.quota_met(aggregator):
+            return False
+        if elapsed >= self.base_duration:
+            return True
+
+        low, high = aggregator.neutral_interval()
+        return high - low <= self.max_ci_width or aggregator.is_stable()
+
+
+# Fixed 5 s capture, matching the original behaviour
+FIXED_POLICY = CapturePolicy(
+    min_samples=0, max_ci_width=0.0,
+    min_duration=5.0, base_duration=5.0, max_duration=5.0,
+)
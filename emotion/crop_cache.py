@@ -0,0 +1,109 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+from utils import metrics
+
+# -------------------------------
+# Near-duplicate crop cache
+# -------------------------------
+# While the child sits still, consecutive 48x48 crops are nearly the same
+# image. Each crop is reduced to a small area-averaged thumbnail (which
+# also averages out sensor noise); if it is within `threshold` grey levels
+# (mean absolute difference) of a recently classified crop, that crop's
+# probabilities are reused instead of running the model.
+#
+# Every `verify_every`-th hit is classified anyway and compared with the
+# cached result, so the agreement of reused results is measured and the
+# cache never serves a stale entry for long. Each frame still adds one
+# sample to the aggregator, so the neutral ratio keeps its weighting.
+
+
+class CropCache:
+    """
+    Bounded cache of recent (thumbnail, probabilities) pairs.
+
+    Parameters:
+    - size: entries kept (0 disables the cache)
+    - threshold: max mean absolute thumbnail difference for a hit
+    - thumb: thumbnail side in pixels
+    - verify_every: classify every n-th hit to measure agreement (0: never)
+    """
+
+    def __init__(self, size=4, threshold=3.0, thumb=12, verify_every=10):
+        self.size         = size
+        self.threshold    = threshold
+        self.thumb        = thumb
+        self.verify_every = verify_every
+        self._entries     = deque(maxlen=max(1, size))
+        self.reset_stats()
+
+    def reset(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        self.hits     = 0
+        self.misses   = 0
+        self.verified = 0
+        self.agreed   = 0
+        self.diff_sum = 0.0
+
+    def _thumbnail(self, crop):
+        return cv2.resize(crop, (self.thumb, self.thumb),
+                          interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _match(self, thumb):
+        # Newest first: a still subject matches the previous frame
+        for entry in reversed(self._entries):
+            if np.abs(entry[0] - thumb).mean() <= self.threshold:
+                return entry
+        return None
+
+    def predict(self, crop, infer):
+        """
+        Probabilities for a uint8 crop: cached for a near-duplicate,
+        otherwise (or when verifying) `infer()` is called.
+        """
+        if self.size <= 0:
+            return infer()
+
+        thumb = self._thumbnail(crop)
+        entry = self._match(thumb)
+        if entry is None:
+            self.misses += 1
+            metrics.count("emotion_cache_misses_total")
+            probs = infer()
+            self._entries.append([thumb, probs])
+            return probs
+
+        self.hits += 1
+        metrics.count("emotion_cache_hits_total")
+        if not self.verify_every or self.hits % self.verify_every:
+            return entry[1]
+
+        probs = infer()
+        cached = np.ravel(entry[1])
+        fresh  = np.ravel(probs)
+        diff   = float(np.abs(cached - fresh).max())
+        self.verified += 1
+        self.diff_sum += diff
+        metrics.observe("emotion_cache_verify_diff", diff)
+        if cached.argmax() == fresh.argmax():
+            self.agreed += 1
+        else:
+            metrics.count("emotion_cache_disagreements_total")
+        entry[0], entry[1] = thumb, probs
+        return probs
+
+    def summary(self):
+        """Hit rate and agreement of verified hits."""
+        lookups = self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "inferences_skipped": self.hits - self.verified,
+            "verified": self.verified,
+            "agreement": round(self.agreed / self.verified, 3) if self.verified else None,
+            "mean_max_diff": round(self.diff_sum / self.verified, 4) if self.verified else None,
+        }
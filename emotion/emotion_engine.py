@@ -1,114 +1,391 @@
 import cv2
+import logging
 import numpy as np
+import os
+import threading
 import time
-from tensorflow.keras.models import load_model
-
-# -------------------------------
-# Load emotion model (FER+)
-# -------------------------------
-emotion_model = load_model(
-    "models/best_emotion_model_ferplus_colab_2.h5",
-    compile=False
+from emotion.capture import RoiTracker, open_capture
+from emotion.capture_policy import CapturePolicy
+from emotion.crop_cache import CropCache
+from emotion.face_detector import get_detector
+from emotion.aggregator import (
+    EmotionAggregator, SessionAggregator, compute_emotion_score, emotion_labels
 )
+from emotion.quantize import load_emotion_model
+from emotion.session_log import SessionLog
+from emotion.stimulus_manager import STIMULI, get_stimulus_manager
+from emotion.subject import SubjectSelector
+from utils import metrics
+from utils.model_registry import get_registry, register_loader
 
-emotion_labels = [
-    "Neutral", "Happy", "Surprise", "Sad",
-    "Angry", "Disgust", "Fear", "Contempt"
-]
+log = logging.getLogger(__name__)
 
-face_cascade = cv2.CascadeClassifier(
-    "emotion/haarcascade_frontalface_default.xml"
-)
+# compute_emotion_score used to live here and is re-exported for callers
+__all__ = [
+    "EmotionEngine", "InferenceBackend", "analysis_worker", "capture_frames",
+    "compute_emotion_score", "get_backend", "run_emotion_session",
+]
 
 # -------------------------------
-# Emotion score logic (UNCHANGED)
+# Shared inference backend (FER+)
 # -------------------------------
-def compute_emotion_score(neutral_ratio):
-    if neutral_ratio < 0.4:
-        return 0
-    elif neutral_ratio < 0.7:
-        return 1
-    else:
-        return 2
+class InferenceBackend:
+    """
+    One loaded emotion model shared by every engine in the process.
+
+    Keras/TFLite models are not safe to call concurrently, so predict()
+    serialises calls behind a lock. `version` names the model in results
+    (the registry version, or the file name for explicit paths).
+    """
+
+    def __init__(self, path, version=None):
+        self.path    = path
+        self.version = version or os.path.basename(path)
+        self._model  = load_emotion_model(path)
+        self._lock  = threading.Lock()
+
+    def predict(self, faces):
+        with self._lock:
+            return self._model.predict(faces, verbose=0)
+
+
+_backends      = {}
+_backends_lock = threading.Lock()
+
+
+@register_loader("emotion")
+def _load_version(version, spec):
+    backend = InferenceBackend(spec["model"], version)
+    # Smoke test: the model must map one 48x48 crop to one probability row
+    probs = np.asarray(backend.predict(np.zeros((1, 48, 48, 1), dtype=np.float32)))
+    if probs.shape != (1, len(emotion_labels)):
+        raise ValueError(f"emotion model {version} returned shape {probs.shape}, "
+                         f"expected (1, {len(emotion_labels)})")
+    return backend
+
+
+def get_backend(path=None):
+    """
+    Process-wide backend for `path`, loaded on first use.
+
+    Without a path the active version from the model registry
+    (models/manifest.json) is used. ASD_EMOTION_MODEL pins another
+    variant, e.g. the int8 .tflite produced by emotion/quantize.py.
+    """
+    path = path or os.environ.get("ASD_EMOTION_MODEL")
+    if path is None:
+        return get_registry().current("emotion")[1]
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = InferenceBackend(path)
+        return _backends[path]
+
 
 # -------------------------------
-# Run emotion session
+# Emotion engine
 # -------------------------------
-def run_emotion_session():
+class EmotionEngine:
+    """
+    Owns one camera, its stimulus display and the per-session state.
 
-    # ✅ Neutral stimulus REMOVED
-    stimuli = {
-        "Happy": "emotion/stimuli/happy.jpg",
-        "Sad": "emotion/stimuli/sad.jpg",
-        "Surprise": "emotion/stimuli/surprise.jpg"
-    }
+    Engines are independent of each other: face detectors are created per
+    thread and the model is shared through a locked InferenceBackend, so
+    several engines can run concurrently in one process. Use as a context
+    manager, or call open() and close() explicitly.
 
-    cap = cv2.VideoCapture(0)
-    session_scores = []
-    total_faces_detected = 0
+    Parameters:
+    - source: camera index, or a video file path (replayed in a loop)
+    - policy: CapturePolicy deciding how long each stimulus runs
+    - profiles: CaptureProfiles to negotiate, in order of preference
+    - backend: InferenceBackend (defaults to the process-wide one)
+    - cache: CropCache reusing results for near-duplicate crops
+      (CropCache(size=0) classifies every crop)
+    - detector: face detector name from emotion/face_detector.py
+      (default: ASD_FACE_DETECTOR, else "haar")
+    - stimuli: StimulusManager (defaults to the process-wide one; give
+      concurrent on-screen engines their own window name)
+    - headless: skip the stimulus window and the baseline/onset pauses
+    """
 
-    for name, img_path in stimuli.items():
+    def __init__(self, source=0, policy=None, backend=None, stimuli=None,
+                 headless=False, profiles=None, cache=None, detector=None):
+        self.source   = source
+        self.policy   = policy or CapturePolicy()
+        self.backend  = backend
+        self.stimuli  = None if headless else (stimuli or get_stimulus_manager())
+        self.profiles = profiles
+        self.capture_settings = None
+        self._cap     = None
+        self._roi     = RoiTracker()
+        self._subject = SubjectSelector()
+        self.cache    = cache or CropCache()
+        self.detector = detector
+        self.last_crop = None   # uint8 48x48 input of the latest inference
 
-        stimulus = cv2.imread(img_path)
+    # ---- lifecycle ----
+    def open(self):
+        if self._cap is not None:
+            return self
+        if self.backend is None:
+            self.backend = get_backend()
+        self._cap, self.capture_settings = open_capture(self.source, self.profiles)
+        self._roi.reset()
+        self._subject.reset()
+        self.cache.reset()
+        self.cache.reset_stats()
+        if self.stimuli is not None:
+            self.stimuli.open()
+        return self
 
-        # Blank baseline screen
-        blank = np.ones_like(stimulus) * 255
-        cv2.namedWindow("Stimulus", cv2.WINDOW_NORMAL)
-        cv2.setWindowProperty("Stimulus", cv2.WND_PROP_TOPMOST, 1)
-        cv2.setWindowProperty("Stimulus", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-        cv2.imshow("Stimulus", blank)
-        time.sleep(1)
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+            log.info("crop cache: %s", self.cache.summary())
+        if self.stimuli is not None:
+            self.stimuli.close()
+            log.info("stimulus onset latency: %s", self.stimuli.onset_summary())
 
-        # Show stimulus
-        cv2.imshow("Stimulus", stimulus)
-        time.sleep(0.5)
+    def __enter__(self):
+        return self.open()
 
-        start_time = time.time()
-        emotion_log = []
+    def __exit__(self, *exc):
+        self.close()
 
-        while time.time() - start_time < 5:
-            ret, frame = cap.read()
-            if not ret:
-                continue
+    # ---- per-frame work ----
+    def _detect(self, frame, region):
+        # Only the region of interest is converted, and only for
+        # detectors that work on grayscale
+        x0, y0, x1, y1 = region
+        detector = get_detector(self.detector)
+        roi = frame[y0:y1, x0:x1]
+        if detector.gray:
+            roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        return roi, detector.detect(roi)
+
+    def analyse_frame(self, frame):
+        """
+        Returns [(box, probabilities)] for the primary subject in `frame`,
+        or [] when no usable face was found.
+        """
+        frame_start = time.perf_counter()
+        h, w = frame.shape[:2]
+        full = (0, 0, w, h)
+
+        region = self._roi.region(frame.shape)
+        roi, faces = self._detect(frame, region)
+        if len(faces) == 0 and region != full:
+            # Lost the face inside the ROI: search the whole frame
+            metrics.count("emotion_roi_misses_total")
+            region = full
+            roi, faces = self._detect(frame, region)
+        ox, oy = region[:2]
+        metrics.count("emotion_faces_total", len(faces))
+
+        # Keep only the child's face; siblings, caregivers and false
+        # positives are not classified
+        subject = self._subject.select([(x + ox, y + oy, fw, fh) for (x, y, fw, fh) in faces])
+        self._roi.update([subject] if subject else [])
+        metrics.observe("emotion_detect_seconds", time.perf_counter() - frame_start)
+        if subject is None:
+            return []
+        metrics.count("emotion_faces_ignored_total", len(faces) - 1)
+
+        x, y, fw, fh = subject
+        face = roi[y - oy:y - oy + fh, x - ox:x - ox + fw]
+        if face.ndim == 3:
+            face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        reason = self._subject.rejects(face)
+        if reason:
+            metrics.count(f"emotion_faces_rejected_{reason}_total")
+            return []
+
+        face = cv2.resize(face, (48, 48))
+        self.last_crop = face
+        # Near-duplicates of a recent crop reuse its result
+        prediction = self.cache.predict(face, lambda: self._infer(face))
+        return [(subject, prediction)]
+
+    def _infer(self, face):
+        face = face / 255.0
+        face = face.reshape(1, 48, 48, 1)
+        with metrics.timer("emotion_inference_seconds"):
+            return self.backend.predict(face)
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=3,
-                minSize=(30, 30)
-            )
+    # ---- session ----
+    def run_session(self, record_path=None, record_crops=False):
+        """
+        Runs the stimulus session and returns the emotion score.
 
-            for (x, y, w, h) in faces:
-                total_faces_detected += 1
+        If `record_path` is given, the per-frame probabilities are saved
+        there as a SessionLog (.npz) so the session can be re-scored later;
+        `record_crops` also stores the 48x48 classifier inputs so it can be
+        re-scored with a different emotion model.
+        """
+        self.open()
+        if not self._cap.isOpened():
+            # Reading would fail instantly on every frame until each
+            # stimulus timed out, at full CPU
+            log.error("cannot open video source %r", self.source)
+            metrics.count("emotion_source_unavailable_total")
+            return "No face detected"
+        policy = self.policy
+        stimuli = self.stimuli
+        names = stimuli.names if stimuli is not None else list(STIMULI)
 
-                face = gray[y:y+h, x:x+w]
-                face = cv2.resize(face, (48, 48))
-                face = face / 255.0
-                face = face.reshape(1, 48, 48, 1)
+        session = SessionAggregator()
+        total_faces_detected = 0
+        session_log = SessionLog(stimuli=names, labels=emotion_labels,
+                                 store_crops=record_crops)
+        session_start = time.time()
 
-                prediction = emotion_model.predict(face, verbose=0)
-                emotion = emotion_labels[np.argmax(prediction)]
-                emotion_log.append(emotion)
+        for stim_id, name in enumerate(names):
 
-            cv2.waitKey(1)
+            if stimuli is not None:
+                # Blank baseline screen
+                stimuli.show_blank()
+                time.sleep(policy.blank_duration)
 
-        cv2.destroyWindow("Stimulus")
+                # Show stimulus
+                stimuli.show(name)
+                time.sleep(policy.onset_delay)
 
-        # Neutral ratio (still used, but no neutral stimulus bias)
-        if emotion_log:
-            neutral_ratio = emotion_log.count("Neutral") / len(emotion_log)
-        else:
-            neutral_ratio = 1.0
+            start_time = time.time()
+            aggregator = EmotionAggregator(num_classes=len(emotion_labels))
 
-        session_scores.append(compute_emotion_score(neutral_ratio))
+            while not policy.should_stop(time.time() - start_time, aggregator):
+                ret, frame = self._cap.read()
+                if not ret:
+                    metrics.count("emotion_frames_dropped_total")
+                    if isinstance(self.source, str):
+                        # Recorded video: loop back to the first frame
+                        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
 
-    cap.release()
-    cv2.destroyAllWindows()
+                frame_start = time.perf_counter()
+                metrics.count("emotion_frames_total")
 
-    if total_faces_detected == 0:
-        return "No face detected"
+                for box, prediction in self.analyse_frame(frame):
+                    total_faces_detected += 1
+                    aggregator.update(prediction)
+                    session_log.append(
+                        time.time() - session_start, stim_id, box, prediction,
+                        crop=self.last_crop
+                    )
 
-    # ✅ Improvement 2: MEAN instead of MAX
-    final_score = round(np.mean(session_scores))
-    return final_score
+                if stimuli is not None:
+                    cv2.waitKey(1)
+                metrics.observe("emotion_frame_seconds", time.perf_counter() - frame_start)
+
+            metrics.observe("emotion_stimulus_samples", aggregator.n)
+
+            # Neutral ratio (still used, but no neutral stimulus bias)
+            session.add(aggregator.score())
+
+        if record_path is not None:
+            session_log.save(record_path)
+
+        if total_faces_detected == 0:
+            return "No face detected"
+
+        # ✅ Improvement 2: MEAN instead of MAX
+        final_score = session.score()
+        return final_score
+
+
+# -------------------------------
+# Run emotion session
+# -------------------------------
+def run_emotion_session(record_path=None, policy=None, source=0, backend=None,
+                        record_crops=False):
+    """
+    Runs one session on a fresh EmotionEngine and returns the emotion score.
+
+    `backend` is the InferenceBackend to use (default: get_backend()); pass
+    it explicitly to know which model version produced the score.
+
+    `policy` is a CapturePolicy deciding how long each stimulus runs;
+    the default ends a stimulus once enough confident samples are in.
+
+    If `record_path` is given, the per-frame probabilities are saved there
+    as a SessionLog (.npz) so the session can be re-scored later;
+    `record_crops` also stores the 48x48 classifier inputs, so
+    `python -m utils.rescore --emotion-model` can re-classify them.
+
+    Set ASD_PROFILE_SESSION to a .prof (cProfile) or .html (pyinstrument)
+    path to capture a profile of the session.
+    """
+    profile_path = os.environ.get("ASD_PROFILE_SESSION")
+    with metrics.timer("emotion_session_seconds"), \
+            EmotionEngine(source=source, policy=policy, backend=backend) as engine:
+        if not profile_path:
+            return engine.run_session(record_path, record_crops)
+        profiler = "pyinstrument" if profile_path.endswith(".html") else "cprofile"
+        with metrics.profile_session(profile_path, profiler):
+            return engine.run_session(record_path, record_crops)
+
+
+# -------------------------------
+# Split capture / analysis processes
+# -------------------------------
+def capture_frames(pool, source=0, stop_event=None, max_frames=None, profiles=None):
+    """
+    Reads frames from `source` straight into a SharedFramePool.
+
+    The camera decodes into the shared slot itself, so frames are never
+    pickled or copied on their way to the analysis workers. Returns the
+    number of frames written.
+    """
+    cap, _ = open_capture(source, profiles)
+    if not cap.isOpened():
+        log.error("cannot open video source %r", source)
+        metrics.count("emotion_source_unavailable_total")
+        return 0
+    written = 0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if max_frames is not None and written >= max_frames:
+                break
+            seq, slot = pool.slot_for_write()
+            ret, frame = cap.read(slot)
+            if not ret:
+                metrics.count("emotion_frames_dropped_total")
+                if isinstance(source, str):
+                    break
+                continue
+            if frame is not slot:
+                # Device delivered another size/format; fit it to the pool
+                slot[...] = cv2.resize(frame, (pool.shape[1], pool.shape[0]))
+            pool.commit(seq)
+            written += 1
+    finally:
+        cap.release()
+    return written
+
+
+def analysis_worker(pool_spec, results, stop_event, model_path=None, poll=0.002):
+    """
+    Process entry point: analyses the newest frame in the shared pool and
+    puts (seq, timestamp, [(box, probabilities), ...]) on `results`.
+    Frames overwritten mid-analysis are discarded.
+    """
+    from emotion.frame_pool import SharedFramePool
+
+    pool = SharedFramePool.attach(**pool_spec)
+    engine = EmotionEngine(backend=get_backend(model_path), headless=True)
+    last = -1
+    try:
+        while not stop_event.is_set():
+            got = pool.latest(after=last)
+            if got is None:
+                time.sleep(poll)
+                continue
+            seq, ts, frame = got
+            faces = engine.analyse_frame(frame)
+            if pool.still_valid(seq):
+                results.put((seq, ts, [(box, probs.tolist()) for box, probs in faces]))
+            else:
+                metrics.count("emotion_frames_overrun_total")
+            last = seq
+    finally:
+        pool.close()
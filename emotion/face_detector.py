@@ -0,0 +1,125 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+# -------------------------------
+# Pluggable face detectors
+# -------------------------------
+# Every detector takes an image region and returns an (N, 4) int array of
+# (x, y, w, h) boxes in region coordinates. Detectors with `gray = True`
+# expect a grayscale region, the others a BGR one, so the engine converts
+# only what the detector needs.
+#
+# Detectors hold OpenCV objects that must not be shared across threads;
+# use get_detector() for a per-thread instance. ASD_FACE_DETECTOR picks
+# the default (see benchmarks/bench_face_detector.py to choose one).
+
+CASCADE_PATH = "emotion/haarcascade_frontalface_default.xml"
+YUNET_MODEL  = "models/face_detection_yunet_2023mar.onnx"
+MIN_FACE     = 30
+
+DETECTORS = {}
+
+
+def register_detector(name):
+    """Decorator adding a detector class to DETECTORS under `name`."""
+    def wrap(cls):
+        cls.name = name
+        DETECTORS[name] = cls
+        return cls
+    return wrap
+
+
+def _no_faces():
+    return np.empty((0, 4), dtype=np.int32)
+
+
+@register_detector("haar")
+class HaarDetector:
+    """Viola-Jones cascade; frontal faces only."""
+    gray = True
+
+    def __init__(self, path=CASCADE_PATH, scale_factor=1.1, min_neighbors=3,
+                 min_size=MIN_FACE):
+        self._cascade      = cv2.CascadeClassifier(path)
+        self.scale_factor  = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size      = min_size
+        if self._cascade.empty():
+            raise FileNotFoundError(f"cannot load Haar cascade {path}")
+
+    def detect(self, image):
+        faces = self._cascade.detectMultiScale(
+            image,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=(self.min_size, self.min_size)
+        )
+        return np.asarray(faces, dtype=np.int32).reshape(-1, 4) if len(faces) else _no_faces()
+
+
+@register_detector("yunet")
+class YuNetDetector:
+    """
+    OpenCV's YuNet CNN (cv2.FaceDetectorYN) from a local ONNX file.
+    Copes with turned heads far better than the cascade at similar cost.
+    """
+    gray     = False
+    PAD_STEP = 64
+
+    def __init__(self, path=YUNET_MODEL, score_threshold=0.7, nms_threshold=0.3,
+                 min_size=MIN_FACE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"YuNet model {path} not found")
+        self._net = cv2.FaceDetectorYN.create(path, "", (320, 320),
+                                              score_threshold, nms_threshold)
+        self._size    = (320, 320)
+        self.min_size = min_size
+
+    def detect(self, image):
+        h, w = image.shape[:2]
+        # The ROI changes size nearly every frame; padding it (bottom/right,
+        # so coordinates are unchanged) to a multiple of PAD_STEP keeps the
+        # network input size, and setInputSize() calls, mostly constant
+        step = self.PAD_STEP
+        size = (-(-w // step) * step, -(-h // step) * step)
+        if size != (w, h):
+            image = cv2.copyMakeBorder(image, 0, size[1] - h, 0, size[0] - w,
+                                       cv2.BORDER_CONSTANT, value=0)
+        if size != self._size:
+            self._net.setInputSize(size)
+            self._size = size
+        _, faces = self._net.detect(image)
+        if faces is None:
+            return _no_faces()
+        boxes = faces[:, :4].round().astype(np.int32)
+        # Boxes can reach past the image border: clip both corners
+        x0 = np.maximum(boxes[:, 0], 0)
+        y0 = np.maximum(boxes[:, 1], 0)
+        x1 = np.minimum(boxes[:, 0] + boxes[:, 2], w)
+        y1 = np.minimum(boxes[:, 1] + boxes[:, 3], h)
+        boxes = np.column_stack([x0, y0, x1 - x0, y1 - y0]).astype(np.int32)
+        return boxes[(boxes[:, 2] >= self.min_size) & (boxes[:, 3] >= self.min_size)]
+
+
+def default_detector():
+    return os.environ.get("ASD_FACE_DETECTOR", "haar")
+
+
+_local = threading.local()
+
+
+def get_detector(name=None):
+    """This thread's instance of detector `name` (default: default_detector())."""
+    name = name or default_detector()
+    cache = getattr(_local, "detectors", None)
+    if cache is None:
+        cache = _local.detectors = {}
+    detector = cache.get(name)
+    if detector is None:
+        if name not in DETECTORS:
+            raise ValueError(f"unknown face detector {name!r}; choose from {sorted(DETECTORS)}")
+        detector = cache[name] = DETECTORS[name]()
+    return detector
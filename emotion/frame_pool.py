@@ -0,0 +1,128 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# -------------------------------
+# Shared-memory frame ring
+# -------------------------------
+# Layout of the shared block:
+#   [ head: int64 ][ seq: int64 * slots ][ ts: float64 * slots ][ frames ]
+# `head` is the sequence number of the newest complete frame. Each slot
+# carries the sequence number of the frame it holds, or -1 while it is
+# being written (a seqlock): readers take a view of the slot, do their
+# work, then call still_valid() to confirm the writer has not lapped them.
+
+
+class SharedFramePool:
+    """
+    Fixed-size ring of frame slots in one SharedMemory block.
+
+    One process writes with write(); any number of processes attach with
+    attach(**pool.spec) and read zero-copy views with latest()/read().
+    """
+
+    def __init__(self, shm, slots, shape, dtype, owner):
+        self.shm    = shm
+        self.slots  = slots
+        self.shape  = tuple(shape)
+        self.dtype  = np.dtype(dtype)
+        self._owner = owner
+
+        buf = shm.buf
+        self._head = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._seq  = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=8)
+        self._ts   = np.ndarray((slots,), dtype=np.float64, buffer=buf,
+                                offset=8 + 8 * slots)
+        self._frames = np.ndarray((slots, *self.shape), dtype=self.dtype, buffer=buf,
+                                  offset=8 + 16 * slots)
+        self._next = int(self._head[0]) + 1
+
+    @staticmethod
+    def _nbytes(slots, shape, dtype):
+        return 8 + 16 * slots + slots * int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create(cls, slots=8, shape=(480, 640, 3), dtype=np.uint8, name=None):
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=cls._nbytes(slots, shape, dtype))
+        pool = cls(shm, slots, shape, dtype, owner=True)
+        pool._head[0] = -1
+        pool._seq[:]  = -1
+        pool._next    = 0
+        return pool
+
+    @classmethod
+    def attach(cls, name, slots, shape, dtype):
+        return cls(shared_memory.SharedMemory(name=name), slots, shape, dtype, owner=False)
+
+    @property
+    def spec(self):
+        """Picklable arguments for attach() in another process."""
+        return {"name": self.shm.name, "slots": self.slots,
+                "shape": self.shape, "dtype": self.dtype.str}
+
+    # ---- writer ----
+    def slot_for_write(self):
+        """
+        Claims the next slot and returns (seq, writable view). Fill the
+        view in place (e.g. cap.read(view)), then call commit(seq).
+        """
+        seq  = self._next
+        slot = seq % self.slots
+        self._seq[slot] = -1
+        return seq, self._frames[slot]
+
+    def commit(self, seq, ts=None):
+        slot = seq % self.slots
+        self._ts[slot]  = time.time() if ts is None else ts
+        self._seq[slot] = seq
+        self._head[0]   = seq
+        self._next      = seq + 1
+
+    def write(self, frame, ts=None):
+        """Copies `frame` into the next slot; returns its sequence number."""
+        seq, view = self.slot_for_write()
+        view[...] = frame
+        self.commit(seq, ts)
+        return seq
+
+    # ---- readers ----
+    @property
+    def head(self):
+        return int(self._head[0])
+
+    def read(self, seq):
+        """(timestamp, view) for frame `seq`, or None if it was overwritten."""
+        slot = seq % self.slots
+        if self._seq[slot] != seq:
+            return None
+        return float(self._ts[slot]), self._frames[slot]
+
+    def latest(self, after=-1):
+        """(seq, timestamp, view) of the newest frame newer than `after`, or None."""
+        seq = self.head
+        if seq <= after or seq < 0:
+            return None
+        got = self.read(seq)
+        if got is None:
+            return None
+        return (seq, *got)
+
+    def still_valid(self, seq):
+        """True if frame `seq` was not overwritten while it was being used."""
+        return self._seq[seq % self.slots] == seq
+
+    # ---- lifecycle ----
+    def close(self):
+        # Drop the views before closing the mapping
+        self._head = self._seq = self._ts = self._frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
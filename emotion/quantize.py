@@ -0,0 +1,216 @@
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from emotion.aggregator import emotion_labels
+
+# -------------------------------
+# Int8 FER+ model variant
+# -------------------------------
+# Post-training full-integer quantisation of the Keras FER+ model into a
+# TFLite flatbuffer, plus a runtime wrapper with the same predict()
+# interface as the Keras model so emotion_engine can use either.
+#
+#   python -m emotion.quantize convert --crops data/face_crops
+#   python -m emotion.quantize check   --crops data/face_crops_heldout
+#
+# `check` is the accuracy regression gate: it exits non-zero when the int8
+# model disagrees with the float model beyond the configured limits.
+
+FLOAT_MODEL = "models/best_emotion_model_ferplus_colab_2.h5"
+INT8_MODEL  = "models/best_emotion_model_ferplus_colab_2_int8.tflite"
+
+
+def _interpreter(path, num_threads=None):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+
+class TFLiteEmotionModel:
+    """
+    Runs a (quantised) TFLite emotion model on CPU.
+
+    predict() takes the same float (N, 48, 48, 1) input in [0, 1] as the
+    Keras model and returns dequantised float probabilities.
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self._interp = _interpreter(path, num_threads)
+        self._interp.allocate_tensors()
+        self._in  = self._interp.get_input_details()[0]
+        self._out = self._interp.get_output_details()[0]
+
+    def _quantize_input(self, x):
+        scale, zero = self._in["quantization"]
+        dtype = self._in["dtype"]
+        if dtype == np.float32 or scale == 0:
+            return x.astype(np.float32)
+        info = np.iinfo(dtype)
+        return np.clip(np.round(x / scale + zero), info.min, info.max).astype(dtype)
+
+    def _dequantize_output(self, y):
+        scale, zero = self._out["quantization"]
+        if self._out["dtype"] == np.float32 or scale == 0:
+            return y.astype(np.float32)
+        return ((y.astype(np.float32) - zero) * scale)
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        out = np.empty((len(x), self._out["shape"][-1]), dtype=np.float32)
+        for i in range(len(x)):
+            self._interp.set_tensor(self._in["index"], self._quantize_input(x[i:i + 1]))
+            self._interp.invoke()
+            out[i] = self._dequantize_output(self._interp.get_tensor(self._out["index"]))[0]
+        return out
+
+
+def load_emotion_model(path=FLOAT_MODEL):
+    """Loads a Keras (.h5/.keras) or TFLite (.tflite) emotion model."""
+    if path.endswith(".tflite"):
+        return TFLiteEmotionModel(path)
+    from tensorflow.keras.models import load_model
+    return load_model(path, compile=False)
+
+
+# -------------------------------
+# Face crop datasets
+# -------------------------------
+def load_crops(directory, labels=None):
+    """
+    Loads 48x48 grayscale face crops as a float (N, 48, 48, 1) array.
+
+    Images may sit directly in `directory` or in sub-folders named after
+    an emotion label; in the latter case the label indices are returned
+    as well (otherwise None).
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "**", "*.*"), recursive=True))
+    crops, targets = [], []
+    for path in paths:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        crops.append(cv2.resize(img, (48, 48)))
+        parent = os.path.basename(os.path.dirname(path))
+        targets.append(labels.index(parent) if labels and parent in labels else -1)
+
+    x = np.asarray(crops, dtype=np.float32).reshape(-1, 48, 48, 1) / 255.0
+    y = np.asarray(targets)
+    return x, (y if len(y) and (y >= 0).all() else None)
+
+
+# -------------------------------
+# Conversion
+# -------------------------------
+def quantize_model(crops, src=FLOAT_MODEL, dst=INT8_MODEL, max_samples=500):
+    """Full-integer post-training quantisation calibrated on `crops`."""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(src, compile=False)
+    calib = crops[:max_samples]
+
+    def representative():
+        for i in range(len(calib)):
+            yield [calib[i:i + 1].astype(np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type  = tf.int8
+    converter.inference_output_type = tf.int8
+
+    with open(dst, "wb") as f:
+        f.write(converter.convert())
+    return dst
+
+
+# -------------------------------
+# Regression gate
+# -------------------------------
+def compare_models(reference, candidate, crops, targets=None, batch_size=64):
+    """
+    Compares two emotion models on the same crops.
+
+    Returns label agreement, mean and max absolute probability difference
+    per class, and (if `targets` is given) each model's accuracy.
+    """
+    ref  = np.concatenate([reference.predict(crops[i:i + batch_size], verbose=0)
+                           for i in range(0, len(crops), batch_size)])
+    cand = np.concatenate([candidate.predict(crops[i:i + batch_size], verbose=0)
+                           for i in range(0, len(crops), batch_size)])
+
+    diff = np.abs(ref - cand)
+    report = {
+        "samples": int(len(crops)),
+        "label_agreement": float((ref.argmax(1) == cand.argmax(1)).mean()),
+        "mean_abs_diff": diff.mean(axis=0).tolist(),
+        "max_abs_diff": diff.max(axis=0).tolist(),
+    }
+    if targets is not None:
+        report["reference_accuracy"] = float((ref.argmax(1) == targets).mean())
+        report["candidate_accuracy"] = float((cand.argmax(1) == targets).mean())
+    return report
+
+
+def gate(report, min_agreement=0.95, max_mean_diff=0.05, max_accuracy_drop=0.02):
+    """Returns a list of failed checks (empty when the candidate passes)."""
+    failures = []
+    if report["label_agreement"] < min_agreement:
+        failures.append(f"label agreement {report['label_agreement']:.3f} < {min_agreement}")
+    worst = max(report["mean_abs_diff"])
+    if worst > max_mean_diff:
+        failures.append(f"mean per-class probability diff {worst:.3f} > {max_mean_diff}")
+    if "candidate_accuracy" in report:
+        drop = report["reference_accuracy"] - report["candidate_accuracy"]
+        if drop > max_accuracy_drop:
+            failures.append(f"accuracy drop {drop:.3f} > {max_accuracy_drop}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantise and validate the FER+ model")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    conv = sub.add_parser("convert", help="produce the int8 TFLite model")
+    conv.add_argument("--crops", required=True, help="calibration face crops")
+    conv.add_argument("--src", default=FLOAT_MODEL)
+    conv.add_argument("--dst", default=INT8_MODEL)
+
+    chk = sub.add_parser("check", help="accuracy regression gate")
+    chk.add_argument("--crops", required=True, help="held-out face crops")
+    chk.add_argument("--reference", default=FLOAT_MODEL)
+    chk.add_argument("--candidate", default=INT8_MODEL)
+    chk.add_argument("--min-agreement", type=float, default=0.95)
+    chk.add_argument("--max-mean-diff", type=float, default=0.05)
+    chk.add_argument("--max-accuracy-drop", type=float, default=0.02)
+
+    args = parser.parse_args(argv)
+    crops, targets = load_crops(args.crops, emotion_labels)
+    if not len(crops):
+        parser.error(f"no face crops found in {args.crops}")
+
+    if args.cmd == "convert":
+        print(quantize_model(crops, args.src, args.dst))
+        return 0
+
+    report = compare_models(load_emotion_model(args.reference),
+                            load_emotion_model(args.candidate), crops, targets)
+    failures = gate(report, args.min_agreement, args.max_mean_diff, args.max_accuracy_drop)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("PASS" if not failures else "REGRESSION")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import numpy as np
+
+# -------------------------------
+# Columnar per-frame session log
+# -------------------------------
+# One row per classified face crop. Columns live in preallocated NumPy
+# buffers that grow geometrically, so appending a sample never creates
+# Python objects beyond the call itself.
+
+NUM_CLASSES = 8
+
+
+class SessionLog:
+    """
+    Compact recording of an emotion session.
+
+    Columns:
+    - t:        float64 seconds since the session started
+    - stimulus: int8 index into `stimuli`
+    - box:      int16 (x, y, w, h) face box in frame coordinates
+    - probs:    float32 (NUM_CLASSES,) classifier output
+    - crops:    uint8 (48, 48) classifier input, only with store_crops=True
+                (lets sessions be re-scored with a new emotion model)
+    """
+
+    def __init__(self, stimuli=(), labels=(), capacity=1024, store_crops=False):
+        self.stimuli     = list(stimuli)
+        self.labels      = list(labels)
+        self.store_crops = store_crops
+        self._n          = 0
+        self._crops      = None
+        self._alloc(max(1, int(capacity)))
+
+    def _alloc(self, capacity):
+        t        = np.empty(capacity, dtype=np.float64)
+        stimulus = np.empty(capacity, dtype=np.int8)
+        box      = np.empty((capacity, 4), dtype=np.int16)
+        probs    = np.empty((capacity, NUM_CLASSES), dtype=np.float32)
+        crops    = np.empty((capacity, 48, 48), dtype=np.uint8) if self.store_crops else None
+
+        if self._n:
+            t[:self._n]        = self._t[:self._n]
+            stimulus[:self._n] = self._stimulus[:self._n]
+            box[:self._n]      = self._box[:self._n]
+            probs[:self._n]    = self._probs[:self._n]
+            if crops is not None:
+                crops[:self._n] = self._crops[:self._n]
+
+        self._t, self._stimulus, self._box, self._probs = t, stimulus, box, probs
+        self._crops = crops
+
+    def __len__(self):
+        return self._n
+
+    def stimulus_id(self, name):
+        """Returns the index for a stimulus name, registering it if new."""
+        if name not in self.stimuli:
+            self.stimuli.append(name)
+        return self.stimuli.index(name)
+
+    def append(self, t, stimulus_id, box, probs, crop=None):
+        if self._n == len(self._t):
+            self._alloc(2 * len(self._t))
+
+        i = self._n
+        self._t[i]        = t
+        self._stimulus[i] = stimulus_id
+        self._box[i]      = box
+        self._probs[i]    = np.ravel(probs)
+        if self._crops is not None:
+            self._crops[i] = 0 if crop is None else crop
+        self._n += 1
+
+    # ---- column views (no copies) ----
+    @property
+    def t(self):
+        return self._t[:self._n]
+
+    @property
+    def stimulus(self):
+        return self._stimulus[:self._n]
+
+    @property
+    def box(self):
+        return self._box[:self._n]
+
+    @property
+    def probs(self):
+        return self._probs[:self._n]
+
+    @property
+    def crops(self):
+        return None if self._crops is None else self._crops[:self._n]
+
+    def predicted(self):
+        """Arg-max class index per row."""
+        return self.probs.argmax(axis=1)
+
+    def for_stimulus(self, stimulus_id):
+        """Boolean row mask for one stimulus."""
+        return self.stimulus == stimulus_id
+
+    # ---- persistence ----
+    def save(self, path):
+        columns = dict(
+            t=self.t,
+            stimulus=self.stimulus,
+            box=self.box,
+            probs=self.probs,
+            stimuli=np.array(self.stimuli, dtype=str),
+            labels=np.array(self.labels, dtype=str),
+        )
+        if self._crops is not None:
+            columns["crops"] = self.crops
+        np.savez_compressed(path, **columns)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            log = cls(
+                stimuli=data["stimuli"].tolist(),
+                labels=data["labels"].tolist(),
+                capacity=len(data["t"]),
+                store_crops="crops" in data.files,
+            )
+            n = len(data["t"])
+            log._t[:n]        = data["t"]
+            log._stimulus[:n] = data["stimulus"]
+            log._box[:n]      = data["box"]
+            log._probs[:n]    = data["probs"]
+            if log.store_crops:
+                log._crops[:n] = data["crops"]
+            log._n = n
+        return log
@@ -0,0 +1,129 @@
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+# ✅ Neutral stimulus REMOVED
+STIMULI = {
+    "Happy": "emotion/stimuli/happy.jpg",
+    "Sad": "emotion/stimuli/sad.jpg",
+    "Surprise": "emotion/stimuli/surprise.jpg"
+}
+
+WINDOW = "Stimulus"
+DEFAULT_DISPLAY_SIZE = (1280, 720)   # used when the window size is unknown
+
+
+# -------------------------------
+# Preloaded stimulus display
+# -------------------------------
+class StimulusManager:
+    """
+    Decodes every stimulus once and keeps display-ready copies.
+
+    Each image is letterboxed onto a white canvas of the display size, so
+    showing a stimulus is a single imshow of a cached uint8 frame. One
+    named window is reused for the whole session. `show` and `show_blank`
+    return the onset latency (time until the frame is handed to the
+    display), which is also collected in `onset_latencies` until the
+    next `open`.
+    """
+
+    def __init__(self, stimuli=STIMULI, window=WINDOW):
+        self.window = window
+        self.names  = list(stimuli)
+        self._source = {name: cv2.imread(path) for name, path in stimuli.items()}
+        missing = [name for name, img in self._source.items() if img is None]
+        if missing:
+            raise FileNotFoundError(f"Could not read stimuli: {missing}")
+
+        self._size   = None
+        self._frames = {}
+        self._blank  = None
+        self._open   = False
+        self.onset_latencies = []
+
+    # ---- scaling ----
+    def _prepare(self, size):
+        if size == self._size:
+            return
+        w, h = size
+        self._blank = np.full((h, w, 3), 255, dtype=np.uint8)
+        for name, img in self._source.items():
+            scale = min(w / img.shape[1], h / img.shape[0])
+            sw, sh = max(1, int(img.shape[1] * scale)), max(1, int(img.shape[0] * scale))
+            interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            canvas = self._blank.copy()
+            x, y = (w - sw) // 2, (h - sh) // 2
+            canvas[y:y + sh, x:x + sw] = cv2.resize(img, (sw, sh), interpolation=interp)
+            self._frames[name] = canvas
+        self._size = size
+
+    def _display_size(self):
+        try:
+            _, _, w, h = cv2.getWindowImageRect(self.window)
+        except cv2.error:
+            return DEFAULT_DISPLAY_SIZE
+        return (w, h) if w > 0 and h > 0 else DEFAULT_DISPLAY_SIZE
+
+    # ---- lifecycle ----
+    def open(self):
+        self.onset_latencies = []
+        if not self._open:
+            cv2.namedWindow(self.window, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(self.window, cv2.WND_PROP_TOPMOST, 1)
+            cv2.setWindowProperty(self.window, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            cv2.waitKey(1)
+            self._open = True
+        self._prepare(self._display_size())
+
+    def close(self):
+        if self._open:
+            cv2.destroyWindow(self.window)
+            cv2.waitKey(1)
+            self._open = False
+
+    # ---- display ----
+    def _present(self, frame, name):
+        start = time.perf_counter()
+        cv2.imshow(self.window, frame)
+        cv2.waitKey(1)
+        latency = time.perf_counter() - start
+        self.onset_latencies.append(latency)
+        metrics.observe("stimulus_onset_seconds", latency)
+        log.debug("stimulus %s onset latency %.1f ms", name, latency * 1000)
+        return latency
+
+    def show_blank(self):
+        return self._present(self._blank, "blank")
+
+    def show(self, name):
+        return self._present(self._frames[name], name)
+
+    def onset_summary(self):
+        """Mean, max and jitter (standard deviation) of onset latency, in ms."""
+        if not self.onset_latencies:
+            return {"count": 0, "mean_ms": 0.0, "max_ms": 0.0, "jitter_ms": 0.0}
+        lat = np.array(self.onset_latencies) * 1000
+        return {
+            "count": len(lat),
+            "mean_ms": float(lat.mean()),
+            "max_ms": float(lat.max()),
+            "jitter_ms": float(lat.std()),
+        }
+
+
+_manager = None
+
+
+def get_stimulus_manager():
+    """Process-wide StimulusManager, decoded on first use."""
+    global _manager
+    if _manager is None:
+        _manager = StimulusManager()
+    return _manager
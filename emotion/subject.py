@@ -0,0 +1,59 @@
+import cv2
+
+# -------------------------------
+# Primary-subject selection
+# -------------------------------
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+class SubjectSelector:
+    """
+    Picks the child's face out of every detection in a frame.
+
+    The face that overlaps the previous subject by at least `min_iou`
+    is kept (stable tracking); otherwise the largest face is taken. The
+    chosen crop is then rejected if it is smaller than `min_size` pixels
+    or blurrier than `min_sharpness` (variance of the Laplacian), so
+    only usable crops reach the classifier.
+    """
+
+    def __init__(self, min_size=48, min_sharpness=30.0, min_iou=0.3):
+        self.min_size      = min_size
+        self.min_sharpness = min_sharpness
+        self.min_iou       = min_iou
+        self._subject = None
+
+    def reset(self):
+        self._subject = None
+
+    def select(self, boxes):
+        """Returns the primary (x, y, w, h) box in `boxes`, or None."""
+        if len(boxes) == 0:
+            return None
+        boxes = [tuple(int(v) for v in b) for b in boxes]
+        best = None
+        if self._subject is not None:
+            overlap, best = max((iou(self._subject, b), b) for b in boxes)
+            if overlap < self.min_iou:
+                best = None
+        if best is None:
+            best = max(boxes, key=lambda b: b[2] * b[3])
+        self._subject = best
+        return best
+
+    def rejects(self, crop):
+        """Reason the grayscale crop is unusable ("small"/"blur"), or None."""
+        h, w = crop.shape[:2]
+        if min(h, w) < self.min_size:
+            return "small"
+        if cv2.Laplacian(crop, cv2.CV_64F).var() < self.min_sharpness:
+            return "blur"
+        return None
@@ -0,0 +1,101 @@
+import numpy as np
+
+# -------------------------------------------------
+# Final risk fusion (survey + emotion)
+# -------------------------------------------------
+# Risk levels are handled as integer codes so whole arrays of historical
+# results can be fused in one vectorised pass.
+
+RISK_LEVELS = np.array(["Low", "Moderate", "High"])
+RISK_CODES  = {name: code for code, name in enumerate(RISK_LEVELS)}
+
+STRATEGIES = {}
+
+
+def register_strategy(name):
+    """Decorator registering a fusion strategy under `name`."""
+    def wrap(fn):
+        STRATEGIES[name] = fn
+        return fn
+    return wrap
+
+
+def risk_to_code(risk):
+    """Maps risk names ("Low"/"Moderate"/"High") to 0/1/2."""
+    risk = np.asarray(risk)
+    codes = np.zeros(risk.shape, dtype=np.int8)
+    for name, code in RISK_CODES.items():
+        codes[risk == name] = code
+    return codes
+
+
+def emotion_to_code(emotion_score):
+    """
+    Maps emotion scores to 0/1/2.
+
+    Non-numeric results such as "No face detected" never escalate the
+    risk and are mapped to 0.
+    """
+    scores = np.asarray(emotion_score, dtype=object)
+    flat = [s if isinstance(s, (int, float, np.integer, np.floating)) else 0
+            for s in scores.ravel()]
+    codes = np.clip(np.nan_to_num(np.array(flat, dtype=np.float64)), 0, 2)
+    return codes.astype(np.int8).reshape(scores.shape)
+
+
+# -------------------------------------------------
+# Strategies
+# -------------------------------------------------
+@register_strategy("rule")
+def _rule(survey_code, emotion_code, survey_prob):
+    # Rule-based fusion (survey priority): either modality can escalate
+    return np.maximum(survey_code, emotion_code)
+
+
+@register_strategy("weighted")
+def _weighted(survey_code, emotion_code, survey_prob,
+              survey_weight=0.7, high=0.7, moderate=0.4):
+    # Blend survey probability with the emotion score rescaled to 0-1,
+    # then apply the same thresholds as predict_survey_risk
+    prob = np.where(np.isnan(survey_prob), survey_code / 2, survey_prob)
+    combined = survey_weight * prob + (1 - survey_weight) * emotion_code / 2
+    return np.where(combined >= high, 2, np.where(combined >= moderate, 1, 0))
+
+
+# -------------------------------------------------
+# Public API
+# -------------------------------------------------
+def fuse_codes(survey_risk, emotion_score, survey_prob=None, strategy="rule", **params):
+    """
+    Vectorised fusion returning integer risk codes (0/1/2).
+
+    All inputs may be scalars or equally shaped arrays. `survey_prob`
+    is only used by probability-based strategies; missing values fall
+    back to the survey risk level.
+    """
+    survey_code  = risk_to_code(survey_risk)
+    emotion_code = emotion_to_code(emotion_score)
+    if survey_prob is None:
+        survey_prob = np.full(survey_code.shape, np.nan)
+    survey_prob = np.asarray(survey_prob, dtype=np.float64)
+
+    fn = STRATEGIES[strategy]
+    return np.asarray(fn(survey_code, emotion_code, survey_prob, **params), dtype=np.int8)
+
+
+def fuse_risk(survey_risk, emotion_score, survey_prob=None, strategy="rule", **params):
+    """
+    Combines survey risk and emotion score into the final risk level.
+
+    Parameters:
+    - survey_risk: str or array of str ("High", "Moderate", "Low")
+    - emotion_score: int (0-2) or array; non-numeric means no face data
+    - survey_prob: float or array (0.0 to 1.0), optional
+    - strategy: name of a registered strategy ("rule" or "weighted")
+
+    Returns:
+    - final risk: str for scalar input, array of str for array input
+    """
+    codes = fuse_codes(survey_risk, emotion_score, survey_prob, strategy, **params)
+    levels = RISK_LEVELS[codes]
+    return str(levels) if levels.ndim == 0 else levels
@@ -0,0 +1,259 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# -------------------------------------------------
+# Lightweight hot-path instrumentation
+# -------------------------------------------------
+# Counters and histograms live in one process-wide registry. When metrics
+# are disabled (ASD_METRICS=0 or set_enabled(False)) every helper returns
+# immediately, so instrumented code pays a single flag check.
+#
+# Environment:
+# - ASD_METRICS=0          disable collection entirely
+# - ASD_METRICS_PORT=9464  serve Prometheus text on 127.0.0.1:<port>/metrics
+# - ASD_METRICS_JSON=path  write a JSON snapshot at exit
+# - ASD_PROFILE=path       profile the whole process run (see profile_session)
+
+HISTOGRAM_WINDOW = 10000          # recent samples kept per histogram
+QUANTILES = (0.5, 0.9, 0.99)
+
+_enabled  = os.environ.get("ASD_METRICS", "1") != "0"
+_lock     = threading.Lock()
+_counters = {}
+_hists    = {}
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self):
+        self.count   = 0
+        self.total   = 0.0
+        self.samples = deque(maxlen=HISTOGRAM_WINDOW)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentiles(self, qs=QUANTILES):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in qs}
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(round(q * last)))] for q in qs}
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _hists.clear()
+
+
+# -------------------------------------------------
+# Recording
+# -------------------------------------------------
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name, value):
+    if not _enabled:
+        return
+    with _lock:
+        hist = _hists.get(name)
+        if hist is None:
+            hist = _hists[name] = _Histogram()
+        hist.add(value)
+
+
+@contextlib.contextmanager
+def _timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+_NULL = contextlib.nullcontext()
+
+
+def timer(name):
+    """Context manager recording elapsed seconds into histogram `name`."""
+    return _timer(name) if _enabled else _NULL
+
+
+@contextlib.contextmanager
+def _cpu_timer(name):
+    start = time.thread_time()
+    try:
+        yield
+    finally:
+        observe(name, time.thread_time() - start)
+
+
+def cpu_timer(name):
+    """
+    Like timer(), but records CPU seconds spent by the calling thread, so
+    concurrent requests served by other threads are not counted.
+    """
+    return _cpu_timer(name) if _enabled else _NULL
+
+
+def timed(name):
+    """Decorator form of timer()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _timer(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def snapshot():
+    """Plain-dict view of all counters and histogram summaries."""
+    with _lock:
+        hists = {
+            name: {
+                "count": h.count,
+                "sum": h.total,
+                "quantiles": {str(q): v for q, v in h.percentiles().items()},
+            }
+            for name, h in _hists.items()
+        }
+        return {"counters": dict(_counters), "histograms": hists}
+
+
+def to_prometheus(prefix="asd_"):
+    snap = snapshot()
+    lines = []
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f"# TYPE {prefix}{name} counter")
+        lines.append(f"{prefix}{name} {value}")
+    for name, h in sorted(snap["histograms"].items()):
+        lines.append(f"# TYPE {prefix}{name} summary")
+        for q, v in h["quantiles"].items():
+            lines.append(f'{prefix}{name}{{quantile="{q}"}} {v}')
+        lines.append(f"{prefix}{name}_sum {h['sum']}")
+        lines.append(f"{prefix}{name}_count {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_json(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+_server = None
+
+
+def serve(port=9464, host="127.0.0.1"):
+    """Starts a background Prometheus-text endpoint (idempotent)."""
+    global _server
+    if _server is not None:
+        return _server
+
+    # Imported here so importing metrics stays cheap for the apps
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+# -------------------------------------------------
+# Whole-session profiling
+# -------------------------------------------------
+@contextlib.contextmanager
+def profile_session(path, engine="cprofile"):
+    """
+    Profiles the enclosed block and writes the result to `path`.
+
+    engine="cprofile" writes a pstats file; engine="pyinstrument" (if
+    installed) writes an HTML report.
+    """
+    if engine == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+
+_started = False
+
+
+def start_from_env():
+    """Applies ASD_METRICS_PORT / ASD_METRICS_JSON / ASD_PROFILE once per process."""
+    global _started
+    if _started:
+        return
+    _started = True
+
+    port = os.environ.get("ASD_METRICS_PORT")
+    if _enabled and port:
+        serve(int(port))
+
+    json_path = os.environ.get("ASD_METRICS_JSON")
+    if _enabled and json_path:
+        atexit.register(write_json, json_path)
+
+    profile_path = os.environ.get("ASD_PROFILE")
+    if profile_path:
+        engine = "pyinstrument" if profile_path.endswith(".html") else "cprofile"
+        ctx = profile_session(profile_path, engine)
+        ctx.__enter__()
+        atexit.register(ctx.__exit__, None, None, None)
@@ -0,0 +1,244 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Versioned model registry
+# -------------------------------------------------
+# models/manifest.json lists every model version and marks one per kind
+# as active:
+#
+#   {
+#     "survey":  {"active": "2",
+#                 "versions": {"2": {"model": "models/survey_model_2.pkl",
+#                                    "encoders": "models/survey_encoders_2.pkl"}}},
+#     "emotion": {"active": "ferplus-2",
+#                 "versions": {"ferplus-2": {"model": "models/best_...h5"}}}
+#   }
+#
+# A kind is loaded on first use. Afterwards refresh() (cheap: one stat of
+# the manifest) notices a new active version and loads and validates it
+# on a background thread (see register_loader). The new model replaces
+# the old one in a single assignment once it is ready; a version that
+# fails to load or validate leaves the old one in use (and is not retried
+# until the manifest changes). Callers take
+# current(kind) once per request/session, so a running screening always
+# finishes on the version it started with, and report the version
+# alongside the result.
+#
+#   python -m utils.model_registry                    # list versions
+#   python -m utils.model_registry activate survey 2  # switch (running apps pick it up)
+
+MANIFEST = "models/manifest.json"
+
+# Used when there is no manifest: the models the apps shipped with
+DEFAULT_MANIFEST = {
+    "survey": {
+        "active": "2",
+        "versions": {
+            "2": {"model": "models/survey_model_2.pkl",
+                  "encoders": "models/survey_encoders_2.pkl"},
+        },
+    },
+    "emotion": {
+        "active": "ferplus-2",
+        "versions": {
+            "ferplus-2": {"model": "models/best_emotion_model_ferplus_colab_2.h5"},
+        },
+    },
+}
+
+_loaders = {}
+
+
+def register_loader(kind):
+    """
+    Decorator registering `fn(version, spec) -> model` for a model kind.
+
+    The loader must also check that the model fits the inputs its callers
+    build and raise ValueError if not, so an incompatible version is never
+    swapped in.
+    """
+    def wrap(fn):
+        _loaders[kind] = fn
+        return fn
+    return wrap
+
+
+class ModelRegistry:
+    """
+    Loaded model per kind plus the manifest describing available versions.
+
+    Parameters:
+    - manifest_path: JSON manifest (DEFAULT_MANIFEST if it does not exist)
+    """
+
+    def __init__(self, manifest_path=MANIFEST):
+        self.manifest_path = manifest_path
+        self._lock       = threading.Lock()
+        self._load_lock  = threading.Lock()
+        self._manifest   = None
+        self._mtime      = None
+        self._active     = {}   # kind -> (version, model)
+        self._loading    = {}   # kind -> version being loaded in the background
+        self._failed     = {}   # kind -> (version, manifest mtime) that failed to load
+
+    # ---- manifest ----
+    def manifest(self):
+        """Current manifest, re-read only when the file changed."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return DEFAULT_MANIFEST
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+                self._mtime = mtime
+            return self._manifest
+
+    def versions(self, kind):
+        return list(self.manifest()[kind]["versions"])
+
+    def active_version(self, kind):
+        return self.manifest()[kind]["active"]
+
+    def _load(self, kind, version):
+        spec = self.manifest()[kind]["versions"].get(version)
+        if spec is None:
+            raise ValueError(f"{kind} model version {version!r} is not in {self.manifest_path}")
+        with metrics.timer(f"model_load_{kind}_seconds"):
+            return _loaders[kind](version, spec)
+
+    # ---- use ----
+    def current(self, kind):
+        """
+        (version, model) to use for the next request or session.
+
+        The first call for a kind loads its active version synchronously.
+        """
+        entry = self._active.get(kind)
+        if entry is not None:
+            return entry
+        with self._load_lock:
+            entry = self._active.get(kind)
+            if entry is None:
+                version = self.active_version(kind)
+                entry = (version, self._load(kind, version))
+                with self._lock:
+                    self._active[kind] = entry
+                log.info("loaded %s model version %s", kind, version)
+        return entry
+
+    def loaded_versions(self):
+        """{kind: version} of the models currently in use."""
+        return {kind: entry[0] for kind, entry in self._active.items()}
+
+    def refresh(self):
+        """
+        Starts background loads for kinds whose active version changed.
+
+        Returns the kinds now loading. Call it between requests/sessions;
+        the swap happens when the new model is ready.
+        """
+        manifest = self.manifest()
+        started = []
+        with self._lock:
+            for kind, (version, _) in self._active.items():
+                wanted = manifest[kind]["active"]
+                if wanted == version or self._loading.get(kind) == wanted:
+                    continue
+                # A version that failed is retried only once the manifest changes
+                if self._failed.get(kind) == (wanted, self._mtime):
+                    continue
+                self._loading[kind] = wanted
+                threading.Thread(target=self._swap, args=(kind, wanted, self._mtime),
+                                 daemon=True).start()
+                started.append(kind)
+        return started
+
+    def _swap(self, kind, version, mtime):
+        try:
+            model = self._load(kind, version)
+        except Exception:
+            # Keep serving the old version
+            log.exception("loading %s model version %s failed", kind, version)
+            metrics.count("model_swap_failures_total")
+            with self._lock:
+                self._failed[kind] = (version, mtime)
+                if self._loading.get(kind) == version:
+                    del self._loading[kind]
+            return
+
+        with self._lock:
+            if self._loading.get(kind) != version:
+                return          # superseded by a newer activation
+            del self._loading[kind]
+            old = self._active[kind][0]
+            self._active[kind] = (version, model)
+        metrics.count("model_swaps_total")
+        log.info("swapped %s model %s -> %s", kind, old, version)
+
+    def activate(self, kind, version):
+        """Marks `version` active in the manifest file."""
+        manifest = json.loads(json.dumps(self.manifest()))
+        spec = manifest[kind]["versions"].get(version)
+        if spec is None:
+            raise ValueError(f"{kind} model version {version!r} is not in the manifest")
+        missing = [path for path in spec.values()
+                   if isinstance(path, str) and not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"{kind} model version {version!r} is missing "
+                                    f"{', '.join(missing)}")
+        manifest[kind]["active"] = version
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide ModelRegistry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or activate model versions")
+    sub = parser.add_subparsers(dest="command")
+    act = sub.add_parser("activate", help="make a version active")
+    act.add_argument("kind")
+    act.add_argument("version")
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    if args.command == "activate":
+        try:
+            registry.activate(args.kind, args.version)
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            parser.error(str(e))
+
+    for kind, entry in registry.manifest().items():
+        print(kind)
+        for version, spec in entry["versions"].items():
+            mark = "*" if version == entry["active"] else " "
+            print(f"  {mark} {version:16s} {spec['model']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from emotion.aggregator import EmotionAggregator, SessionAggregator
+from emotion.session_log import SessionLog
+from utils.fusion import RISK_LEVELS, fuse_risk
+from utils.survey_utils import (
+    SURVEY_ENCODERS, SURVEY_MODEL, load_model_files, predict_survey_risk_batch
+)
+
+# -------------------------------------------------
+# Batch re-scoring of stored screenings
+# -------------------------------------------------
+# Re-runs stored survey records and recorded emotion sessions through new
+# models and writes the results, versioned, next to the old ones:
+#
+#   <out>/
+#     checkpoint.json        run settings + completed chunks
+#     parts/chunk-000042.jsonl
+#     results.jsonl          merged once every chunk is done
+#     drift.json             how many children changed risk band
+#
+# Records (CSV or JSONL) carry id, A1..A10, age_months, sex, family_asd
+# and optionally the previous survey_risk / survey_prob / emotion_score /
+# final_risk. Emotion sessions are SessionLog files <sessions>/<id>.npz;
+# they are re-aggregated from their probability log, or re-classified
+# when they contain crops and a new emotion model is given.
+#
+# Runs are resumable: finished chunks are written atomically and skipped
+# when the same command is run again.
+#
+#   python -m utils.rescore archive/records.csv --sessions archive/sessions \
+#       --survey-model models/survey_model_3.pkl --workers 8
+
+CHUNK_SIZE = 5000
+ANSWER_KEYS = [f"A{i}" for i in range(1, 11)]
+
+
+# -------------------------------------------------
+# Input
+# -------------------------------------------------
+def read_records(path):
+    """Yields survey records (dicts) from a CSV or JSONL file."""
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def chunked(records, size):
+    it = iter(records)
+    for index in itertools.count():
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield index, chunk
+
+
+def model_version(*paths):
+    """Short content hash identifying a set of model files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if path:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()[:10]
+
+
+# -------------------------------------------------
+# Emotion sessions
+# -------------------------------------------------
+def score_log(log, model=None, batch_size=512):
+    """
+    Emotion score for a recorded SessionLog, aggregated exactly like a
+    live session. With `model` and stored crops the crops are classified
+    again; otherwise the recorded probabilities are used.
+    """
+    if len(log) == 0:
+        return "No face detected"
+
+    probs = log.probs
+    if model is not None and log.crops is not None:
+        faces = log.crops.reshape(-1, 48, 48, 1) / 255.0
+        probs = np.concatenate([model.predict(faces[i:i + batch_size], verbose=0)
+                                for i in range(0, len(faces), batch_size)])
+
+    session = SessionAggregator()
+    for stim_id in range(len(log.stimuli)):
+        aggregator = EmotionAggregator(num_classes=probs.shape[1])
+        for row in probs[log.for_stimulus(stim_id)]:
+            aggregator.update(row)
+        session.add(aggregator.score())
+    return session.score()
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+_worker = {}
+
+
+def _init_worker(survey_model, survey_encoders, emotion_model):
+    _worker["survey"] = load_model_files(survey_model, survey_encoders)
+    if emotion_model:
+        from emotion.quantize import load_emotion_model
+        _worker["emotion"] = load_emotion_model(emotion_model)
+    else:
+        _worker["emotion"] = None
+
+
+def _part_path(parts_dir, index):
+    return os.path.join(parts_dir, f"chunk-{index:06d}.jsonl")
+
+
+def _old_value(record, key):
+    value = record.get(key)
+    return None if value in (None, "") else value
+
+
+def _as_score(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return value
+
+
+def _process_chunk(index, records, sessions_dir, parts_dir):
+    ids = [str(r.get("id") or f"row-{index}-{i}") for i, r in enumerate(records)]
+
+    risks, probs = predict_survey_risk_batch(
+        [[int(r[k]) for k in ANSWER_KEYS] for r in records],
+        [int(r["age_months"]) for r in records],
+        [r["sex"] for r in records],
+        [r["family_asd"] for r in records],
+        models=_worker["survey"],
+    )
+
+    emotion = []
+    for record_id, record in zip(ids, records):
+        path = os.path.join(sessions_dir, f"{record_id}.npz") if sessions_dir else None
+        if path and os.path.exists(path):
+            emotion.append(score_log(SessionLog.load(path), _worker["emotion"]))
+        else:
+            # No recording: keep the stored emotion result
+            emotion.append(_as_score(_old_value(record, "emotion_score")))
+
+    final = fuse_risk(risks, np.array(emotion, dtype=object), probs)
+
+    tmp = os.path.join(parts_dir, f".chunk-{index:06d}.tmp")
+    with open(tmp, "w") as f:
+        for i, (record_id, record) in enumerate(zip(ids, records)):
+            old_survey = _old_value(record, "survey_risk")
+            old_emotion = _as_score(_old_value(record, "emotion_score"))
+            old_final = _old_value(record, "final_risk")
+            if old_final is None and old_survey is not None and old_emotion is not None:
+                old_final = fuse_risk(old_survey, old_emotion)
+            f.write(json.dumps({
+                "id": record_id,
+                "survey_risk": str(risks[i]),
+                "survey_prob": round(float(probs[i]), 4),
+                "emotion_score": emotion[i],
+                "final_risk": str(final[i]),
+                "old_survey_risk": old_survey,
+                "old_emotion_score": old_emotion,
+                "old_final_risk": old_final,
+            }) + "\n")
+    os.replace(tmp, _part_path(parts_dir, index))
+    return index, len(records)
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def drift_report(results_path):
+    """Risk-band transition counts between the old and the new results."""
+    bands = [str(b) for b in RISK_LEVELS]
+    matrix = {old: {new: 0 for new in bands} for old in bands}
+    total = compared = changed = up = down = 0
+    with open(results_path) as f:
+        for line in f:
+            row = json.loads(line)
+            total += 1
+            old, new = row["old_final_risk"], row["final_risk"]
+            if old not in bands:
+                continue
+            compared += 1
+            matrix[old][new] += 1
+            if old != new:
+                changed += 1
+                if bands.index(new) > bands.index(old):
+                    up += 1
+                else:
+                    down += 1
+    return {
+        "records": total,
+        "compared": compared,
+        "changed": changed,
+        "changed_pct": round(100 * changed / compared, 2) if compared else 0.0,
+        "escalated": up,
+        "de_escalated": down,
+        "transitions": matrix,
+    }
+
+
+def rescore(records_path, out_dir, sessions_dir=None,
+            survey_model=SURVEY_MODEL, survey_encoders=SURVEY_ENCODERS,
+            emotion_model=None, version=None, workers=None, chunk_size=CHUNK_SIZE):
+    version = version or model_version(survey_model, survey_encoders, emotion_model)
+    parts_dir = os.path.join(out_dir, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    settings = {
+        "records": os.path.abspath(records_path),
+        "sessions": sessions_dir and os.path.abspath(sessions_dir),
+        "survey_model": survey_model,
+        "survey_encoders": survey_encoders,
+        "emotion_model": emotion_model,
+        "version": version,
+        "chunk_size": chunk_size,
+    }
+    checkpoint_path = os.path.join(out_dir, "checkpoint.json")
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            previous = json.load(f)
+        if previous["settings"] != settings:
+            raise SystemExit(f"{out_dir} holds a run with different settings; "
+                             "use another --out or delete it")
+
+    def save_checkpoint():
+        tmp = checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"settings": settings, "done": sorted(done)}, f)
+        os.replace(tmp, checkpoint_path)
+
+    done = set()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(survey_model, survey_encoders, emotion_model)) as pool:
+        # Keep only a few chunks in flight so huge archives are streamed
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+        pending = set()
+
+        def collect():
+            finished, rest = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, n = future.result()
+                done.add(index)
+                save_checkpoint()
+                print(f"chunk {index} ({n} records) done  [{len(done)} chunks]", flush=True)
+            return rest
+
+        for index, chunk in chunked(read_records(records_path), chunk_size):
+            if os.path.exists(_part_path(parts_dir, index)):
+                done.add(index)
+                continue
+            pending.add(pool.submit(_process_chunk, index, chunk, sessions_dir, parts_dir))
+            if len(pending) >= max_pending:
+                pending = collect()
+        while pending:
+            pending = collect()
+
+    results_path = os.path.join(out_dir, "results.jsonl")
+    with open(results_path, "w") as out:
+        for index in sorted(done):
+            with open(_part_path(parts_dir, index)) as part:
+                out.writelines(part)
+
+    report = drift_report(results_path)
+    report["version"] = version
+    with open(os.path.join(out_dir, "drift.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored screenings with new models")
+    parser.add_argument("records", help="CSV or JSONL survey records")
+    parser.add_argument("--sessions", help="directory of <id>.npz SessionLog recordings")
+    parser.add_argument("--out", help="output directory (default: next to the records)")
+    parser.add_argument("--survey-model", default=SURVEY_MODEL)
+    parser.add_argument("--survey-encoders", default=SURVEY_ENCODERS)
+    parser.add_argument("--emotion-model", help="re-classify stored crops with this model")
+    parser.add_argument("--version", help="result version label (default: model hash)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    version = args.version or model_version(args.survey_model, args.survey_encoders,
+                                            args.emotion_model)
+    out_dir = args.out or os.path.join(os.path.dirname(os.path.abspath(args.records)),
+                                       f"rescored-{version}")
+    report = rescore(args.records, out_dir, args.sessions, args.survey_model,
+                     args.survey_encoders, args.emotion_model, version,
+                     args.workers, args.chunk_size)
+
+    print(f"version {report['version']}: {report['changed']} of {report['compared']} "
+          f"children changed risk band ({report['changed_pct']}%), "
+          f"{report['escalated']} up / {report['de_escalated']} down")
+    print(f"results in {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
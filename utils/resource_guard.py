@@ -0,0 +1,144 @@
+import gc
+import logging
+import os
+import resource
+import threading
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Runtime resource-leak guard
+# -------------------------------------------------
+# Samples process resources at points where the app should be back in the
+# same state (e.g. between screenings) and reports growth since a
+# baseline that exceeds a budget. The baseline is taken after `warmup`
+# checks, so one-off costs such as loading the models are not counted.
+#
+# Environment:
+# - ASD_RESOURCE_BUDGETS="rss_mb=150,open_fds=8"  override budgets (growth)
+# - ASD_RESOURCE_GUARD=0                         disable the guard
+
+DEFAULT_BUDGETS = {
+    "rss_mb":     200.0,    # resident memory
+    "open_fds":   16,       # file descriptors (cameras, sockets, files)
+    "gc_objects": 100000,   # objects tracked by the garbage collector
+    "threads":    4,
+    "tk_widgets": 50,       # only with a Tk probe (desktop.py)
+}
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def gc_objects():
+    return len(gc.get_objects())
+
+
+PROBES = {
+    "rss_mb":     rss_mb,
+    "open_fds":   open_fds,
+    "gc_objects": gc_objects,
+    "threads":    threading.active_count,
+}
+
+
+def parse_budgets(spec):
+    """"rss_mb=150,open_fds=8" -> {"rss_mb": 150.0, "open_fds": 8.0}"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        budgets[name.strip()] = float(value)
+    return budgets
+
+
+class ResourceGuard:
+    """
+    Parameters:
+    - budgets: allowed growth per resource over the baseline
+    - probes: extra {name: fn() -> number} samplers (e.g. Tk widget count)
+    - warmup: checks before the baseline is taken
+    """
+
+    def __init__(self, budgets=None, probes=None, warmup=1):
+        self.budgets  = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.probes   = {**PROBES, **(probes or {})}
+        self.warmup   = warmup
+        self.checks   = 0
+        self.baseline = None
+        self.latest   = None
+        self.exceeded = {}      # resource -> largest growth past its budget
+
+    def sample(self):
+        # Collect first so garbage awaiting the cycle collector is not a "leak"
+        gc.collect()
+        values = {}
+        for name, probe in self.probes.items():
+            value = probe()
+            if value is not None:
+                values[name] = value
+                metrics.observe(f"resource_{name}", value)
+        return values
+
+    def growth(self):
+        if self.baseline is None or self.latest is None:
+            return {}
+        return {name: self.latest[name] - self.baseline[name]
+                for name in self.latest if name in self.baseline}
+
+    def check(self):
+        """Samples resources; returns {resource: growth} for budgets exceeded."""
+        self.latest = self.sample()
+        self.checks += 1
+        if self.checks <= self.warmup:
+            return {}
+        if self.baseline is None:
+            self.baseline = self.latest
+            return {}
+
+        violations = {name: grown for name, grown in self.growth().items()
+                      if name in self.budgets and grown > self.budgets[name]}
+        for name, grown in violations.items():
+            if grown > self.exceeded.get(name, float("-inf")):
+                if name not in self.exceeded:
+                    metrics.count("resource_budget_exceeded_total")
+                log.warning("%s grew by %.1f since the baseline (budget %.1f) after %d checks",
+                            name, grown, self.budgets[name], self.checks)
+                self.exceeded[name] = grown
+        return violations
+
+    def report(self):
+        return {
+            "checks": self.checks,
+            "baseline": self.baseline,
+            "latest": self.latest,
+            "growth": self.growth(),
+            "budgets": self.budgets,
+            "exceeded": self.exceeded,
+        }
+
+
+def from_env(probes=None, warmup=1):
+    """ResourceGuard configured from the environment, or None if disabled."""
+    if os.environ.get("ASD_RESOURCE_GUARD", "1") == "0":
+        return None
+    budgets = dict(DEFAULT_BUDGETS)
+    budgets.update(parse_budgets(os.environ.get("ASD_RESOURCE_BUDGETS", "")))
+    return ResourceGuard(budgets, probes, warmup)
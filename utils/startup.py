@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+# -------------------------------------------------
+# Import-time diagnostics
+# -------------------------------------------------
+# Wraps `python -X importtime` so the cost of importing an entry point can
+# be inspected without reading the raw stderr dump.
+
+
+def import_profile(target="desktop", extra_args=()):
+    """
+    Imports `target` in a fresh interpreter under -X importtime.
+
+    Returns a list of (cumulative_us, self_us, module) tuples, one per
+    imported module, in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *extra_args, "-c", f"import {target}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    if proc.returncode != 0 and not rows:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else
+                           f"importing {target} failed")
+    return rows
+
+
+def _depth(module):
+    # importtime indents nested imports by two spaces per level
+    return (len(module) - len(module.lstrip()) - 1) // 2
+
+
+def total_import_us(rows):
+    """Total import time of the target, in microseconds."""
+    return sum(c for c, _, m in rows if _depth(m) == 0)
+
+
+def top_level_costs(rows):
+    """
+    Cost per top-level package (numpy, cv2, tensorflow, ...): the
+    cumulative time of its outermost import, wherever it was triggered.
+    """
+    costs = {}
+    for cumulative, _, module in rows:
+        root = module.strip().split(".")[0]
+        costs[root] = max(costs.get(root, 0), cumulative)
+    return sorted(costs.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def format_report(rows, top=20):
+    total = total_import_us(rows)
+    lines = [f"Import-time profile (total {total / 1000:.1f} ms)", ""]
+    lines.append(f"{'cumulative ms':>14s} {'self ms':>9s}  module")
+    for cumulative, self_us, module in sorted(rows, reverse=True)[:top]:
+        lines.append(f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {module.strip()}")
+    lines += ["", "By top-level package:"]
+    for name, cumulative in top_level_costs(rows)[:top]:
+        lines.append(f"{cumulative / 1000:14.1f} ms  {name}")
+    return "\n".join(lines)
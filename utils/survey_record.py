@@ -0,0 +1,124 @@
+import struct
+
+import numpy as np
+
+# -------------------------------------------------
+# Bit-packed survey records
+# -------------------------------------------------
+# One survey (the model's 13 inputs) in 4 bytes:
+#
+#   answers     uint16  A1..A10 in bits 0..9 (A1 = bit 0)
+#   age_months  uint8
+#   flags       uint8   bit 0: sex (0 "f", 1 "m"), bit 1: family_asd (0 "no", 1 "yes")
+#
+# Bulk data is a NumPy structured array of RECORD_DTYPE (save with np.save,
+# share through shared memory, index by answer pattern); single records
+# are the same 4 bytes via encode()/decode(). Both convert losslessly to
+# the (N, 13) model input.
+
+RECORD_DTYPE  = np.dtype([("answers", "<u2"), ("age_months", "u1"), ("flags", "u1")])
+SEX_VALUES    = ("f", "m")
+FAMILY_VALUES = ("no", "yes")
+NUM_ANSWERS   = 10
+
+_STRUCT = struct.Struct("<HBB")
+_BITS   = np.arange(NUM_ANSWERS, dtype=np.uint16)
+
+
+# -------------------------------------------------
+# Single records
+# -------------------------------------------------
+def pack_answers(answers):
+    """A1..A10 (0/1 values) as a 10-bit integer."""
+    if len(answers) != NUM_ANSWERS:
+        raise ValueError(f"expected {NUM_ANSWERS} answers, got {len(answers)}")
+    bits = 0
+    for i, answer in enumerate(answers):
+        if answer not in (0, 1):
+            raise ValueError(f"answer A{i + 1} must be 0 or 1, got {answer!r}")
+        bits |= int(answer) << i
+    return bits
+
+
+def unpack_answers(bits):
+    return [(bits >> i) & 1 for i in range(NUM_ANSWERS)]
+
+
+def _flags(sex, family_asd):
+    try:
+        return SEX_VALUES.index(sex) | FAMILY_VALUES.index(family_asd) << 1
+    except ValueError:
+        raise ValueError(f"unknown sex/family_asd value: {sex!r}, {family_asd!r}") from None
+
+
+def encode(answers, age_months, sex, family_asd):
+    """Packs one survey into 4 bytes (also usable as a cache key)."""
+    return _STRUCT.pack(pack_answers(answers), int(age_months), _flags(sex, family_asd))
+
+
+def decode(data):
+    """Inverse of encode(): (answers, age_months, sex, family_asd)."""
+    bits, age_months, flags = _STRUCT.unpack(data)
+    return (unpack_answers(bits), age_months,
+            SEX_VALUES[flags & 1], FAMILY_VALUES[flags >> 1 & 1])
+
+
+# -------------------------------------------------
+# Bulk
+# -------------------------------------------------
+def from_columns(answers, age_months, sex, family_asd):
+    """
+    Structured array of RECORD_DTYPE from column data.
+
+    Parameters:
+    - answers: (N, 10) array-like of 0/1 values (A1-A10)
+    - age_months: length-N ints
+    - sex, family_asd: length-N strings ("m"/"f", "yes"/"no")
+    """
+    answers = np.asarray(answers).reshape(-1, NUM_ANSWERS)
+    if not np.isin(answers, (0, 1)).all():
+        raise ValueError("answers must be 0 or 1")
+    answers = answers.astype(np.uint16)
+    ages = np.asarray(age_months)
+    if ages.shape != (len(answers),):
+        raise ValueError(f"expected {len(answers)} ages, got shape {ages.shape}")
+    # Same range encode() enforces through struct; no silent wrap or truncation
+    if ages.dtype.kind not in "iuf" or (ages % 1 != 0).any() or \
+            ((ages < 0) | (ages > 255)).any():
+        raise ValueError("age_months must be whole numbers in 0-255")
+    sex    = np.asarray(sex)
+    family = np.asarray(family_asd)
+    if not (np.isin(sex, SEX_VALUES).all() and np.isin(family, FAMILY_VALUES).all()):
+        raise ValueError("unknown sex/family_asd value")
+
+    records = np.empty(len(answers), dtype=RECORD_DTYPE)
+    records["answers"]    = (answers << _BITS).sum(axis=1)
+    records["age_months"] = ages
+    records["flags"]      = (sex == SEX_VALUES[1]) | (family == FAMILY_VALUES[1]) << 1
+    return records
+
+
+def from_bytes(data):
+    """Zero-copy structured-array view of concatenated encode() records."""
+    return np.frombuffer(data, dtype=RECORD_DTYPE)
+
+
+def answers_matrix(records):
+    """(N, 10) uint8 answers of a structured array."""
+    return (records["answers"][:, None] >> _BITS & 1).astype(np.uint8)
+
+
+def features(records, encoders):
+    """
+    (N, 13) model input for a structured array: A1-A10, age, and sex and
+    family_asd encoded with the survey model's own label encoders.
+    """
+    sex_codes    = encoders['sex'].transform(list(SEX_VALUES))
+    family_codes = encoders['family_asd'].transform(list(FAMILY_VALUES))
+    flags = records["flags"]
+    return np.column_stack([
+        answers_matrix(records).astype(np.int64),
+        records["age_months"].astype(np.int64),
+        sex_codes[flags & 1],
+        family_codes[flags >> 1 & 1],
+    ])
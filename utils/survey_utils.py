@@ -1,15 +1,55 @@
 import pickle
 import numpy as np
+from utils import metrics, survey_record
+from utils.model_registry import get_registry, register_loader
 
-# Load trained model
-with open("models/survey_model_2.pkl", "rb") as f:
-    survey_model = pickle.load(f)
+SURVEY_MODEL    = "models/survey_model_2.pkl"
+SURVEY_ENCODERS = "models/survey_encoders_2.pkl"
 
-# Load encoders
-with open("models/survey_encoders_2.pkl", "rb") as f:
-    encoders = pickle.load(f)
 
-def predict_survey_risk(answers, age_months, sex, family_asd):
+def load_model_files(model_path=SURVEY_MODEL, encoders_path=SURVEY_ENCODERS):
+    """Unpickles a (survey_model, encoders) pair from the given files."""
+    with open(model_path, "rb") as f:
+        survey_model = pickle.load(f)
+    with open(encoders_path, "rb") as f:
+        encoders = pickle.load(f)
+    return survey_model, encoders
+
+
+NUM_FEATURES = 13   # A1-A10, age, sex, family_asd
+
+
+@register_loader("survey")
+def _load_version(version, spec):
+    survey_model, encoders = load_model_files(spec["model"], spec["encoders"])
+    n_features = getattr(survey_model, "n_features_in_", NUM_FEATURES)
+    if n_features != NUM_FEATURES:
+        raise ValueError(f"survey model {version} expects {n_features} inputs, "
+                         f"the apps provide {NUM_FEATURES}")
+    missing = {"sex", "family_asd"} - set(encoders)
+    if missing:
+        raise ValueError(f"survey encoders {version} lack {sorted(missing)}")
+    return survey_model, encoders
+
+
+def current_models():
+    """(version, (survey_model, encoders)) of the active survey model."""
+    return get_registry().current("survey")
+
+
+def load_models():
+    """
+    Loads the survey model and encoders on first use.
+
+    Unpickling pulls in scikit-learn, so it is deferred until a prediction
+    (or an explicit warm-up) needs it instead of running at import time.
+    The version comes from the model registry (models/manifest.json).
+    """
+    return current_models()[1]
+
+
+@metrics.timed("survey_predict_seconds")
+def predict_survey_risk(answers, age_months, sex, family_asd, models=None):
     """
     Predicts ASD risk from survey responses.
     
@@ -18,12 +58,15 @@ def predict_survey_risk(answers, age_months, sex, family_asd):
     - age_months: int (18-36)
     - sex: str ("m" or "f")
     - family_asd: str ("yes" or "no")
+    - models: (survey_model, encoders) pair; defaults to load_models()
     
     Returns:
     - risk: str ("High", "Moderate", or "Low")
     - probability: float (0.0 to 1.0)
     """
     
+    survey_model, encoders = models or load_models()
+
     # Encode categorical features
     sex_enc    = encoders['sex'].transform([sex])[0]
     family_enc = encoders['family_asd'].transform([family_asd])[0]
@@ -44,5 +87,38 @@ def predict_survey_risk(answers, age_months, sex, family_asd):
         risk = "Moderate"
     else:
         risk = "Low"
-    
-    return risk, probability
\ No newline at end of file
+
+    metrics.count(f"survey_risk_{risk.lower()}_total")
+    return risk, probability
+
+
+def predict_survey_risk_batch(answers, age_months, sex, family_asd, models=None):
+    """
+    Vectorised predict_survey_risk for many records at once.
+
+    Parameters:
+    - answers: (N, 10) array-like of binary values (A1-A10)
+    - age_months, sex, family_asd: length-N sequences
+    - models: (survey_model, encoders) pair; defaults to load_models()
+
+    Returns:
+    - risks: (N,) array of str ("High", "Moderate", or "Low")
+    - probabilities: (N,) float array
+    """
+    records = survey_record.from_columns(answers, age_months, sex, family_asd)
+    return predict_survey_risk_packed(records, models)
+
+
+def predict_survey_risk_packed(records, models=None):
+    """
+    predict_survey_risk_batch for bit-packed records (a structured array
+    of survey_record.RECORD_DTYPE). Same return values.
+    """
+    survey_model, encoders = models or load_models()
+
+    features = survey_record.features(records, encoders)
+    probabilities = survey_model.predict_proba(features)[:, 1]
+
+    risks = np.where(probabilities >= 0.7, "High",
+                     np.where(probabilities >= 0.4, "Moderate", "Low"))
+    return risks, probabilities